@@ -0,0 +1,16 @@
+"""
+ASGI config for app project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+Django 2.1 has no ASGI support of its own, so core.asgi runs the WSGI
+handler on thread pools behind an event loop.
+"""
+
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+
+from core.asgi import ASGIHandler  # noqa: E402
+
+application = ASGIHandler()
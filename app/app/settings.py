@@ -52,6 +52,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'app.urls'
@@ -74,20 +75,83 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'app.wsgi.application'
 
+ASGI_APPLICATION = 'app.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
+# Connections come from a per process pool (core.backends) unless
+# DB_POOL is 0; with pooling every request returns its connection
+
+DB_POOL = bool(int(os.environ.get('DB_POOL', 1)))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'core.backends.pooled_postgresql' if DB_POOL
+            else 'django.db.backends.postgresql'
+        ),
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'MAX_IDLE': int(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+            'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'CHECK_AFTER': float(os.environ.get('DB_POOL_CHECK_AFTER', 1)),
+        },
     }
 }
 
+# Safe method requests read from replicas, see core.db_router
+# DB_REPLICA_HOSTS is a comma separated list of hot standby hosts; set
+# DB_REPLICA_NAME to use a second database on the same server instead
+
+DATABASE_REPLICAS = []
+
+for index, host in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1
+):
+    alias = f'replica{index}'
+    DATABASES[alias] = dict(
+        DATABASES['default'],
+        HOST=host.strip(),
+        NAME=os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        # Tests read the primary's test database through replica aliases
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+
+# Production server, see the serve command
+# SERVER_WORKERS of 0 starts two workers per CPU plus one; keep
+# SERVER_THREADS within DB_POOL_MAX_SIZE so threads never wait on the pool
+
+SERVER = {
+    'BIND': os.environ.get('SERVER_BIND', '0.0.0.0:8000'),
+    'WORKERS': int(os.environ.get('SERVER_WORKERS', 0)),
+    'THREADS': int(os.environ.get('SERVER_THREADS', 4)),
+    'KEEPALIVE': int(os.environ.get('SERVER_KEEPALIVE', 5)),
+    'TIMEOUT': int(os.environ.get('SERVER_TIMEOUT', 30)),
+    'GRACEFUL_TIMEOUT': int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30)),
+    'MAX_REQUESTS': int(os.environ.get('SERVER_MAX_REQUESTS', 0)),
+    'PRELOAD': bool(int(os.environ.get('SERVER_PRELOAD', 1))),
+    'PIDFILE': os.environ.get('SERVER_PIDFILE'),
+}
+
+# Threads running requests under ASGI (serve --asgi), see core.asgi
+# Safe method requests get their own pool so writes cannot starve reads
+
+ASGI_READ_THREADS = int(os.environ.get('ASGI_READ_THREADS', 8))
+ASGI_WRITE_THREADS = int(os.environ.get('ASGI_WRITE_THREADS', 2))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -131,4 +195,75 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
-AUTH_USER_MODEL = 'core.User'
\ No newline at end of file
+AUTH_USER_MODEL = 'core.User'
+
+
+# Token authentication cache, see core.authentication
+# Credentials are only cached once TOKEN_AUTH_SHARED_CACHE names a CACHES
+# alias shared by every process, which carries revocations between them
+
+TOKEN_AUTH_CACHE = {
+    'LOCAL_MAX_SIZE': 4096,
+    'LOCAL_TTL': 60,
+    'SHARED_CACHE': os.environ.get('TOKEN_AUTH_SHARED_CACHE'),
+    'SHARED_TTL': 300,
+}
+
+
+# Background tasks, see core.tasks
+# 0 runs tasks inline in the calling thread
+
+BACKGROUND_TASK_WORKERS = int(os.environ.get('BACKGROUND_TASK_WORKERS', 2))
+
+RECIPE_IMAGE_MAX_UPLOAD_SIZE = int(
+    os.environ.get('RECIPE_IMAGE_MAX_UPLOAD_SIZE', 10 * 1024 * 1024)
+)
+
+
+# Recipe list response cache, see recipe.response_cache
+# Set RECIPE_RESPONSE_SHARED_CACHE to a CACHES alias to share entries
+# between processes instead of keeping them in local memory
+
+RECIPE_RESPONSE_CACHE = {
+    'LOCAL_MAX_SIZE': 1024,
+    'LOCAL_MAX_BYTES': 64 * 1024 * 1024,
+    'TTL': 300,
+    'SHARED_CACHE': os.environ.get('RECIPE_RESPONSE_SHARED_CACHE'),
+    # Log the hit and miss counters every this many lookups
+    'STATS_LOG_INTERVAL': 1000,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'recipe.response_cache': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+
+# API rendering and parsing, see core.fast_json
+# JSON is encoded with orjson when it is installed; set JSON_BACKEND=json
+# to always use the stdlib encoder
+
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'orjson')
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.fast_json.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
@@ -0,0 +1,18 @@
+"""
+Settings for running the test suite, e.g.
+python manage.py test --settings=app.test_settings
+
+Adds an SQLite database standing in for a read replica, which the
+routing tests opt in to with DATABASE_REPLICAS. Nothing replicates into
+it, so rows written to only one database show which one was read.
+"""
+
+import os
+
+from app.settings import *  # noqa: F401,F403
+from app.settings import BASE_DIR, DATABASES
+
+DATABASES['test_replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(BASE_DIR, 'test_replica.sqlite3'),
+}
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from core.db_router import SAFE_METHODS
+
+# Room for the multipart boundaries and headers around an uploaded image
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class BodyTooLarge(Exception):
+    """The request body is larger than any endpoint accepts"""
+
+
+class ASGIHandler:
+    """ASGI application running Django's WSGI handler on thread pools
+
+    Django 2.1 views are synchronous, so each request runs on a bounded
+    pool of threads once its body has been received, and its response
+    is sent from the event loop. Slow clients and idle keep-alive
+    connections only hold a coroutine, not a thread. Safe method
+    requests, the list and retrieve reads that make up most traffic, get
+    their own pool so slow writes and uploads cannot starve them.
+
+    Request bodies are spooled to a temporary file as they arrive, and a
+    body larger than the biggest image upload or form Django accepts is
+    answered with a 413 without being read to the end.
+    """
+
+    def __init__(self, wsgi_application=None, read_threads=None,
+                 write_threads=None, max_body_size=None):
+        self.wsgi_application = wsgi_application or get_wsgi_application()
+        self.max_body_size = max_body_size or max(
+            settings.RECIPE_IMAGE_MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD,
+            settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+        )
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=read_threads or settings.ASGI_READ_THREADS,
+            thread_name_prefix='asgi-read'
+        )
+        self.write_executor = ThreadPoolExecutor(
+            max_workers=write_threads or settings.ASGI_WRITE_THREADS,
+            thread_name_prefix='asgi-write'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.handle(scope, receive, send)
+        else:
+            raise ValueError(f'Unsupported ASGI scope type {scope["type"]}')
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.read_executor.shutdown()
+                self.write_executor.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle(self, scope, receive, send):
+        try:
+            body = await self.read_body(scope, receive)
+        except BodyTooLarge:
+            await send_too_large(send)
+            return
+        if body is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        if scope['method'] in SAFE_METHODS:
+            executor = self.read_executor
+        else:
+            executor = self.write_executor
+        try:
+            response = await loop.run_in_executor(
+                executor, self.run_wsgi, loop, get_environ(scope, body), send
+            )
+        finally:
+            body.close()
+        if response is not None:
+            status, headers, content = response
+            await send(start_message(status, headers))
+            await send({'type': 'http.response.body', 'body': content})
+
+    async def read_body(self, scope, receive):
+        """Spool the request body, or return None if the client went away
+
+        Raises BodyTooLarge as soon as the declared or received length
+        exceeds the limit.
+        """
+        declared = dict(scope['headers']).get(b'content-length')
+        if declared and declared.isdigit() and \
+                int(declared) > self.max_body_size:
+            raise BodyTooLarge()
+
+        body = SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    body.close()
+                    return None
+                body.write(message.get('body', b''))
+                if body.tell() > self.max_body_size:
+                    raise BodyTooLarge()
+                if not message.get('more_body', False):
+                    body.seek(0)
+                    return body
+        except BaseException:
+            body.close()
+            raise
+
+    def run_wsgi(self, loop, environ, send):
+        """Run the WSGI app on a pool thread
+
+        The response is returned as (status, headers, content). Streaming
+        responses are sent from this thread instead, as they are read,
+        and None is returned. Either way the response is closed on the
+        thread that produced it, which closes its database connections.
+        """
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        result = self.wsgi_application(environ, start_response)
+        try:
+            if not getattr(result, 'streaming', False):
+                return started[0], started[1], b''.join(result)
+
+            send_sync(start_message(*started))
+            for chunk in result:
+                if chunk:
+                    send_sync({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            send_sync({'type': 'http.response.body'})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+
+async def send_too_large(send):
+    content = json.dumps({'detail': 'Request body too large.'}).encode()
+    await send(start_message('413 Payload Too Large', [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(content))),
+    ]))
+    await send({'type': 'http.response.body', 'body': content})
+
+
+def start_message(status, headers):
+    return {
+        'type': 'http.response.start',
+        'status': int(status.split(' ', 1)[0]),
+        'headers': [
+            (name.lower().encode('latin1'), value.encode('latin1'))
+            for name, value in headers
+        ],
+    }
+
+
+def get_environ(scope, body):
+    """Build the WSGI environ for an ASGI request and its spooled body"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    path = scope['path'].encode('utf-8').decode('latin1')
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': path,
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f'HTTP/{scope["http_version"]}',
+        'CONTENT_LENGTH': str(body.seek(0, 2)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    body.seek(0)
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for name, value in scope['headers']:
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name == 'CONTENT_LENGTH':
+            continue
+        if name != 'CONTENT_TYPE':
+            name = f'HTTP_{name}'
+        value = value.decode('latin1')
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+
+    return environ
@@ -0,0 +1,139 @@
+import copy
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache import LRUCache
+
+DEFAULT_TOKEN_CACHE = {
+    'LOCAL_MAX_SIZE': 4096,
+    'LOCAL_TTL': 60,
+    'SHARED_CACHE': None,
+    'SHARED_TTL': 300,
+}
+
+
+class TokenCache:
+    """Two tier cache of token key -> (user, token) credentials
+
+    Lookups try the in-process LRU first, then the shared Django cache.
+    Every entry records the token's revocation marker, which lives in
+    the shared cache, and is only served while that marker is unchanged.
+    Revoking a token replaces its marker, so every process stops
+    accepting it at once, and a local hit costs one small shared cache
+    read instead of a database query. Without a shared cache nothing is
+    cached, as revocations could not reach the other processes.
+    """
+
+    def __init__(self, local_max_size, local_ttl,
+                 shared_cache=None, shared_ttl=None):
+        self.local = LRUCache(max_size=local_max_size, ttl=local_ttl)
+        self.shared_cache = shared_cache
+        self.shared_ttl = shared_ttl
+
+    @classmethod
+    def from_settings(cls):
+        """Build the cache from the TOKEN_AUTH_CACHE setting"""
+        options = dict(DEFAULT_TOKEN_CACHE)
+        options.update(getattr(settings, 'TOKEN_AUTH_CACHE', {}))
+
+        return cls(
+            local_max_size=options['LOCAL_MAX_SIZE'],
+            local_ttl=options['LOCAL_TTL'],
+            shared_cache=options['SHARED_CACHE'],
+            shared_ttl=options['SHARED_TTL'],
+        )
+
+    @property
+    def shared(self):
+        if self.shared_cache is None:
+            return None
+
+        return caches[self.shared_cache]
+
+    @staticmethod
+    def _shared_key(key, prefix='auth-token'):
+        """Hash the token so raw keys are never written to the cache"""
+        return f'{prefix}:{hashlib.sha256(key.encode()).hexdigest()}'
+
+    def marker(self, key):
+        """Return the token's current revocation marker, starting one
+
+        Read it before looking the token up, so a revocation that lands
+        during the lookup invalidates the entry that is then stored. A
+        marker that expires is replaced, which only causes misses.
+        """
+        if self.shared is None:
+            return None
+
+        marker_key = self._shared_key(key, 'auth-token-marker')
+        self.shared.add(marker_key, uuid.uuid4().hex, self.shared_ttl)
+
+        return self.shared.get(marker_key)
+
+    def get(self, key):
+        """Return cached (user, token) credentials or None"""
+        if self.shared is None:
+            return None
+
+        entry = self.local.get(key)
+        from_shared = entry is None
+        if from_shared:
+            entry = self.shared.get(self._shared_key(key))
+        if entry is None:
+            return None
+
+        credentials, marker = entry
+        current = self.shared.get(self._shared_key(key, 'auth-token-marker'))
+        if current is None or marker != current:
+            self.local.delete(key)
+            return None
+        if from_shared:
+            self.local.set(key, entry)
+
+        return credentials
+
+    def set(self, key, credentials, marker):
+        """Cache credentials looked up after `marker` was read"""
+        if self.shared is None or marker is None:
+            return
+
+        entry = (credentials, marker)
+        self.local.set(key, entry)
+        self.shared.set(self._shared_key(key), entry, self.shared_ttl)
+
+    def revoke(self, key):
+        """Stop every process from serving cached credentials for a token"""
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.set(
+                self._shared_key(key, 'auth-token-marker'),
+                uuid.uuid4().hex,
+                self.shared_ttl
+            )
+            self.shared.delete(self._shared_key(key))
+
+    def clear(self):
+        """Empty the local tier, the shared tier is left to its TTL"""
+        self.local.clear()
+
+
+token_cache = TokenCache.from_settings()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token and user lookup"""
+
+    def authenticate_credentials(self, key):
+        credentials = token_cache.get(key)
+        if credentials is None:
+            marker = token_cache.marker(key)
+            credentials = super().authenticate_credentials(key)
+            token_cache.set(key, credentials, marker)
+
+        user, token = credentials
+        # Hand out a copy so request code never mutates the cached user
+        return (copy.copy(user), token)
@@ -0,0 +1,126 @@
+import os
+import threading
+
+from django.db.backends.postgresql import base as postgresql
+from django.db.backends.postgresql.creation import DatabaseCreation as \
+    PostgreSQLDatabaseCreation
+
+from core.backends.pooled_postgresql.pool import ConnectionPool, PoolTimeout
+
+Database = postgresql.Database
+
+DEFAULT_POOL_OPTIONS = {
+    'MIN_SIZE': 0,
+    'MAX_SIZE': 10,
+    'MAX_IDLE': 300,
+    'MAX_LIFETIME': 3600,
+    'TIMEOUT': 10,
+    'CHECK_AFTER': 0,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _check(connection):
+    """Check a connection still answers before it is handed out"""
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    connection.rollback()
+
+    return True
+
+
+def _reset(connection):
+    """End any open transaction and restore the connect time defaults"""
+    if connection.closed:
+        return False
+    connection.rollback()
+    connection.autocommit = False
+
+    return True
+
+
+def get_pool(alias, settings_dict, conn_params):
+    """Return this process's pool for a database and connection params
+
+    Pools are keyed by process id too, so a forked worker never reuses
+    sockets its parent opened.
+    """
+    key = (alias, os.getpid(), repr(sorted(conn_params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = dict(DEFAULT_POOL_OPTIONS)
+            options.update(settings_dict.get('POOL', {}))
+            pool = _pools[key] = ConnectionPool(
+                connect=lambda: Database.connect(**conn_params),
+                close=lambda connection: connection.close(),
+                check=_check,
+                reset=_reset,
+                min_size=options['MIN_SIZE'],
+                max_size=options['MAX_SIZE'],
+                max_idle=options['MAX_IDLE'],
+                max_lifetime=options['MAX_LIFETIME'],
+                timeout=options['TIMEOUT'],
+                check_after=options['CHECK_AFTER'],
+            )
+
+    return pool
+
+
+def close_pools():
+    """Close the idle connections of every pool in this process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+class DatabaseCreation(PostgreSQLDatabaseCreation):
+    """Close pooled connections before test databases are dropped"""
+
+    def _create_test_db(self, *args, **kwargs):
+        close_pools()
+        return super()._create_test_db(*args, **kwargs)
+
+    def _destroy_test_db(self, *args, **kwargs):
+        close_pools()
+        return super()._destroy_test_db(*args, **kwargs)
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+    """PostgreSQL backend that checks connections out of a process pool
+
+    Closing a connection, as Django does at the end of each request when
+    CONN_MAX_AGE is 0, returns it to the pool instead of disconnecting.
+    The pool is configured by the POOL dict of the database settings.
+    """
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias, self.settings_dict, conn_params)
+        try:
+            self.pool.fill()
+            connection = self.pool.acquire()
+        except PoolTimeout as exc:
+            raise Database.OperationalError(str(exc)) from exc
+
+        # As in the parent, but for connections that may be reused
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
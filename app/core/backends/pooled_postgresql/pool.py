@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No connection became available before the checkout timeout"""
+
+
+class ConnectionPool:
+    """Thread safe pool of database connections
+
+    Connections are handed out most recently used first, so idle ones
+    age out at the other end of the queue. Those idle for longer than
+    `check_after` seconds are health checked before they are handed out,
+    and any idle for longer than `max_idle` are closed while more than
+    `min_size` connections are open. Connections older than
+    `max_lifetime` are closed instead of being reused. At most
+    `max_size` connections are open, and checkouts wait up to `timeout`
+    seconds for one to be released.
+    """
+
+    def __init__(self, connect, close, check=None, reset=None, min_size=0,
+                 max_size=10, max_idle=300, max_lifetime=3600, timeout=10,
+                 check_after=0):
+        self._connect = connect
+        self._close = close
+        self._check = check
+        self._reset = reset
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_after = check_after
+        # (connection, created at, released at) tuples, newest on the right
+        self._idle = deque()
+        self._created_at = {}
+        self._size = 0
+        self._condition = threading.Condition()
+
+    @property
+    def size(self):
+        """Number of open connections, idle or checked out"""
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def fill(self):
+        """Open connections until `min_size` are open"""
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            connection = self._open()
+            self.release(connection)
+
+    def acquire(self):
+        """Check out a healthy connection, opening one if there is room"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = self._checkout(deadline)
+            if entry is None:
+                return self._open()
+
+            connection, created_at, released_at = entry
+            if self._is_usable(connection, created_at, released_at):
+                return connection
+            self._discard(connection)
+
+    def release(self, connection):
+        """Return a connection to the pool, or close it if it is unusable"""
+        created_at = self._created_at.get(id(connection))
+        if created_at is None or self._is_expired(created_at) or \
+                not self._run_hook(self._reset, connection):
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle.append((connection, created_at, time.monotonic()))
+            stale = self._pop_stale()
+            self._condition.notify()
+        for connection in stale:
+            self._discard(connection)
+
+    def close(self):
+        """Close every idle connection"""
+        with self._condition:
+            idle = [connection for connection, _, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self._discard(connection)
+
+    def _checkout(self, deadline):
+        """Pop an idle entry, or reserve room and return None to open one"""
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f'No connection was released within {self.timeout}s '
+                        f'with all {self.max_size} in use'
+                    )
+                self._condition.wait(remaining)
+
+    def _open(self):
+        """Open a connection in a slot that has already been reserved"""
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._created_at[id(connection)] = time.monotonic()
+
+        return connection
+
+    def _discard(self, connection):
+        with self._condition:
+            if self._created_at.pop(id(connection), None) is not None:
+                self._size -= 1
+            self._condition.notify()
+        self._run_hook(self._close, connection)
+
+    def _pop_stale(self):
+        """Remove entries idle for too long, oldest first, down to min_size"""
+        stale = []
+        now = time.monotonic()
+        while self._idle and self._size - len(stale) > self.min_size:
+            _, _, released_at = self._idle[0]
+            if now - released_at <= self.max_idle:
+                break
+            stale.append(self._idle.popleft()[0])
+
+        return stale
+
+    def _is_expired(self, created_at):
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def _is_usable(self, connection, created_at, released_at):
+        if self._is_expired(created_at):
+            return False
+        if time.monotonic() - released_at < self.check_after:
+            return True
+
+        return self._run_hook(self._check, connection)
+
+    @staticmethod
+    def _run_hook(hook, connection):
+        """Run a connection hook, treating any error as a failed check"""
+        if hook is None:
+            return True
+        try:
+            return hook(connection) is not False
+        except Exception:
+            logger.warning('Discarding a pooled connection', exc_info=True)
+            return False
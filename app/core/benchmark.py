@@ -0,0 +1,126 @@
+import random
+import time
+
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+
+from core.models import Tag, Ingredient, Recipe
+
+
+class BenchmarkCommand(BaseCommand):
+    """Base for commands that time code paths against throwaway data
+
+    Everything `run_benchmark` writes is rolled back once it returns, so
+    benchmarks are safe to run against a development database.
+    """
+    default_iterations = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=self.default_iterations,
+            help='Number of times each measured call is repeated',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run_benchmark(**options)
+            transaction.set_rollback(True)
+
+    def run_benchmark(self, **options):
+        raise NotImplementedError
+
+    def measure(self, label, func, iterations):
+        """Time `func` and report its mean and p99 latency and queries"""
+        func()
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+
+        per_call_ms = sum(timings) * 1000 / iterations
+        timings.sort()
+        p99_ms = timings[min(len(timings) - 1, len(timings) * 99 // 100)]
+        p99_ms *= 1000
+        self.stdout.write(
+            f'{label}: {per_call_ms:.3f} ms/call, p99 {p99_ms:.3f} ms, '
+            f'{len(queries.captured_queries) / iterations:.2f} queries/call'
+        )
+
+        return per_call_ms
+
+
+def seed_recipe_data(user, recipes=1000, tags=50, ingredients=200,
+                     links_per_recipe=3, seed=0):
+    """Bulk insert recipes with randomly linked tags and ingredients"""
+    rng = random.Random(seed)
+    Tag.objects.bulk_create(
+        Tag(user=user, name=f'Tag {i}', normalized_name=f'tag {i}')
+        for i in range(tags)
+    )
+    Ingredient.objects.bulk_create(
+        Ingredient(
+            user=user,
+            name=f'Ingredient {i}',
+            normalized_name=f'ingredient {i}'
+        )
+        for i in range(ingredients)
+    )
+    Recipe.objects.bulk_create(
+        Recipe(
+            user=user,
+            title=f'Recipe {i}',
+            time_minutes=rng.randint(5, 240),
+            price=Decimal(rng.randint(100, 9999)) / 100,
+        )
+        for i in range(recipes)
+    )
+
+    tag_ids = list(Tag.objects.filter(user=user).values_list('id', flat=True))
+    ingredient_ids = list(
+        Ingredient.objects.filter(user=user).values_list('id', flat=True)
+    )
+    recipe_ids = list(
+        Recipe.objects.filter(user=user).values_list('id', flat=True)
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+        for recipe_id in recipe_ids
+        for tag_id in rng.sample(tag_ids, min(links_per_recipe, tags))
+    )
+    Recipe.ingredients.through.objects.bulk_create(
+        Recipe.ingredients.through(
+            recipe_id=recipe_id,
+            ingredient_id=ingredient_id
+        )
+        for recipe_id in recipe_ids
+        for ingredient_id in rng.sample(
+            ingredient_ids,
+            min(links_per_recipe, ingredients)
+        )
+    )
+
+    return recipe_ids, tag_ids, ingredient_ids
+
+
+def viewset_queryset(viewset_class, user, params, action='list'):
+    """Return the queryset a viewset builds for a request with params"""
+    request = Request(RequestFactory().get('/', params))
+    request.user = user
+    view = viewset_class(
+        action=action,
+        request=request,
+        args=(),
+        kwargs={},
+        format_kwarg=None
+    )
+
+    return view.get_queryset()
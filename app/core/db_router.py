@@ -0,0 +1,86 @@
+import random
+import threading
+
+from django.conf import settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = threading.local()
+
+
+def use_replicas():
+    """Send reads on this thread to one replica until it writes"""
+    replicas = settings.DATABASE_REPLICAS
+    _state.replica = random.choice(replicas) if replicas else None
+
+
+def use_primary():
+    """Send every read on this thread to the primary"""
+    _state.replica = None
+
+
+class ReplicaRouter:
+    """Route reads to a replica while a safe method request is handled
+
+    Reads go to a replica from DATABASE_REPLICAS, picked once per request
+    so replicas lagging by different amounts are never mixed, and only
+    when the thread opted in with `use_replicas`; management commands and
+    background tasks keep to the primary. The first write pins the rest
+    of the request to the primary, so it reads what it has just written.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+
+        return getattr(_state, 'replica', None) or 'default'
+
+    def db_for_write(self, model, **hints):
+        use_primary()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every configured database is the primary or a copy of it
+        aliases = set(settings.DATABASES)
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Let safe method requests read from replicas
+
+    Streaming responses run their queries as the server reads them, after
+    this middleware has returned, so for those the thread keeps its
+    replica until the server closes the response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            use_replicas()
+        else:
+            use_primary()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            use_primary()
+            raise
+
+        if response.streaming:
+            close = response.close
+
+            def close_and_use_primary():
+                try:
+                    close()
+                finally:
+                    use_primary()
+
+            response.close = close_and_use_primary
+        else:
+            use_primary()
+
+        return response
@@ -0,0 +1,68 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+UTF8_CHARSETS = ('utf-8', 'utf8')
+
+
+def get_fast_json():
+    """Return orjson if it is installed and enabled, None otherwise"""
+    if getattr(settings, 'JSON_BACKEND', 'orjson') != 'orjson':
+        return None
+
+    return orjson
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer that encodes with orjson when it is available
+
+    Output matches the stdlib based renderer. Types orjson does not
+    encode the same way, such as Decimal, lazy strings and datetimes,
+    are handed to DRF's encoder. Indented or ASCII only output, and
+    integers beyond 64 bits, fall back to the stdlib renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        backend = get_fast_json()
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if data is None or backend is None or indent or \
+                self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = backend.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=backend.OPT_PASSTHROUGH_DATETIME
+            )
+        except backend.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like the stdlib renderer, so output is valid JavaScript
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace(
+            '\u2029'.encode(), b'\\u2029'
+        )
+
+
+class FastJSONParser(JSONParser):
+    """JSON parser that decodes UTF-8 bodies with orjson when available"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        backend = get_fast_json()
+        if backend is None or encoding.lower() not in UTF8_CHARSETS:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return backend.loads(stream.read())
+        except backend.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
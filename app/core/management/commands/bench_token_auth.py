@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from core import authentication
+from core.authentication import CachedTokenAuthentication, TokenCache
+from core.benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    """Compare token authentication overhead with and without caching"""
+    help = 'Benchmark TokenAuthentication against CachedTokenAuthentication'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--shared-cache',
+            default=authentication.token_cache.shared_cache or 'default',
+            help='CACHES alias holding shared entries and markers',
+        )
+
+    def run_benchmark(self, iterations, shared_cache, **options):
+        user = get_user_model().objects.create_user(
+            'bench-token-auth@example.com',
+            'Password1'
+        )
+        token = Token.objects.create(user=user)
+        request = RequestFactory().get(
+            '/',
+            HTTP_AUTHORIZATION=f'Token {token.key}'
+        )
+        token_cache = TokenCache(
+            local_max_size=authentication.token_cache.local.max_size,
+            local_ttl=authentication.token_cache.local.ttl,
+            shared_cache=shared_cache,
+            shared_ttl=authentication.token_cache.shared_ttl or 300,
+        )
+
+        baseline = self.measure(
+            'TokenAuthentication',
+            lambda: TokenAuthentication().authenticate(request),
+            iterations
+        )
+        with patch.object(authentication, 'token_cache', token_cache):
+            cached = self.measure(
+                'CachedTokenAuthentication',
+                lambda: CachedTokenAuthentication().authenticate(request),
+                iterations
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Speedup: {baseline / cached:.1f}x'
+        ))
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from core.backends.pooled_postgresql.base import close_pools
+from recipe.views import TagViewSet
+
+BACKENDS = (
+    ('Connect per request', 'django.db.backends.postgresql'),
+    ('Pooled connections', 'core.backends.pooled_postgresql'),
+)
+
+
+class Command(BaseCommand):
+    """Compare request throughput with and without the connection pool
+
+    Each request closes its connections when it finishes, as Django does
+    with CONN_MAX_AGE set to 0, so the direct backend reconnects every
+    time while the pooled one hands back a connection it already holds.
+    The test user is committed so every thread can see it, and deleted
+    afterwards.
+    """
+    help = 'Load test the pooled PostgreSQL backend against the default one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Number of concurrent client threads',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Number of requests each thread makes',
+        )
+
+    def handle(self, *args, threads, requests, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The pool load test needs PostgreSQL')
+
+        user = get_user_model().objects.create_user(
+            'load-test-db-pool@example.com',
+            'Password1'
+        )
+        token = Token.objects.create(user=user)
+        settings_dict = connections.databases['default']
+        engine = settings_dict['ENGINE']
+        try:
+            rates = [
+                self.run_round(label, backend, token, threads, requests)
+                for label, backend in BACKENDS
+            ]
+        finally:
+            settings_dict['ENGINE'] = engine
+            close_pools()
+            user.delete()
+
+        direct, pooled = rates
+        self.stdout.write(self.style.SUCCESS(
+            f'Speedup: {pooled / direct:.1f}x'
+        ))
+
+    def run_round(self, label, backend, token, threads, requests):
+        # Fresh threads load a fresh wrapper for the engine set here
+        connections.databases['default']['ENGINE'] = backend
+        view = TagViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        errors = []
+
+        def client():
+            try:
+                for _ in range(requests):
+                    request = factory.get(
+                        '/',
+                        HTTP_AUTHORIZATION=f'Token {token.key}'
+                    )
+                    view(request).render()
+                    connections.close_all()
+            except Exception as exc:
+                errors.append(exc)
+
+        workers = [threading.Thread(target=client) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        if errors:
+            raise CommandError(f'{label}: {errors[0]!r}')
+
+        rate = threads * requests / elapsed
+        self.stdout.write(f'{label}: {rate:.0f} requests/s')
+
+        return rate
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.server import Server, default_workers
+
+
+class Command(BaseCommand):
+    """Serve the API with gunicorn worker processes and threads
+
+    Send the master HUP to restart workers gracefully with new settings.
+    Preloaded code is only reloaded by a new master: send USR2, then
+    TERM to the old master once the new one is up.
+    """
+    help = 'Run the production server'
+
+    def add_arguments(self, parser):
+        server = settings.SERVER
+        parser.add_argument('--bind', default=server['BIND'])
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=server['WORKERS'] or default_workers(),
+            help='Number of worker processes',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=server['THREADS'],
+            help='Number of request threads in each worker',
+        )
+        parser.add_argument(
+            '--keepalive',
+            type=int,
+            default=server['KEEPALIVE'],
+            help='Seconds to hold idle keep-alive connections open',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=server['TIMEOUT'],
+            help='Seconds before a silent worker is restarted',
+        )
+        parser.add_argument(
+            '--graceful-timeout',
+            type=int,
+            default=server['GRACEFUL_TIMEOUT'],
+            help='Seconds workers get to finish requests on reload',
+        )
+        parser.add_argument(
+            '--max-requests',
+            type=int,
+            default=server['MAX_REQUESTS'],
+            help='Requests after which a worker is replaced, 0 for never',
+        )
+        parser.add_argument(
+            '--no-preload',
+            action='store_false',
+            dest='preload',
+            default=server['PRELOAD'],
+            help='Load the app in each worker instead of before forking',
+        )
+        parser.add_argument(
+            '--asgi',
+            action='store_true',
+            help='Serve app.asgi with uvicorn workers instead of threads',
+        )
+        parser.add_argument(
+            '--pid',
+            default=server['PIDFILE'],
+            help='File to write the master process id to, for signals',
+        )
+
+    def handle(self, *args, **options):
+        Server(
+            self.get_server_options(options),
+            asgi=options['asgi']
+        ).run()
+
+    @staticmethod
+    def get_server_options(options):
+        return {
+            'bind': options['bind'],
+            'workers': options['workers'],
+            'worker_class': (
+                'uvicorn.workers.UvicornWorker' if options.get('asgi')
+                else 'gthread'
+            ),
+            'threads': options['threads'],
+            'keepalive': options['keepalive'],
+            'timeout': options['timeout'],
+            'graceful_timeout': options['graceful_timeout'],
+            'max_requests': options['max_requests'],
+            # Stagger restarts so workers are not all replaced at once
+            'max_requests_jitter': options['max_requests'] // 10,
+            'preload_app': options['preload'],
+            'pidfile': options['pid'],
+        }
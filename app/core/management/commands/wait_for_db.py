@@ -1,23 +1,121 @@
+import random
 import time
 
 from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+
+def probe(connection, connect_timeout):
+    """Open a connection, if needed, and run a trivial query"""
+    settings_dict = connection.settings_dict
+    options = settings_dict['OPTIONS']
+    if connection.vendor == 'postgresql':
+        # libpq counts whole seconds and treats 1 as 2
+        settings_dict['OPTIONS'] = dict(
+            options,
+            connect_timeout=max(2, round(connect_timeout))
+        )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except OperationalError:
+        connection.close()
+        raise
+    finally:
+        settings_dict['OPTIONS'] = options
+
+
+def unapplied_migrations(connection):
+    executor = MigrationExecutor(connection)
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
 
 
 class Command(BaseCommand):
-    """Django command to puase execution until database is available"""
+    """Django command to pause execution until the database is available
+
+    Probes are retried with jittered exponential backoff, so a database
+    that is nearly up is noticed within milliseconds, until the deadline
+    passes.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait in total before failing',
+        )
+        parser.add_argument(
+            '--connect-timeout',
+            type=float,
+            default=2,
+            help='Seconds to wait for each connection attempt',
+        )
+        parser.add_argument(
+            '--initial-delay',
+            type=float,
+            default=0.05,
+            help='Longest wait, in seconds, before the first retry',
+        )
+        parser.add_argument(
+            '--max-delay',
+            type=float,
+            default=2,
+            help='Longest wait, in seconds, between retries',
+        )
+        parser.add_argument(
+            '--migrations',
+            action='store_true',
+            help='Also wait until every migration has been applied',
+        )
+
+    def handle(self, *args, database, timeout, connect_timeout,
+               initial_delay, max_delay, migrations, **options):
+        connection = connections[database]
+        deadline = time.monotonic() + timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
 
-    def handle(self, *args, **options):
         self.stdout.write('Waiting for database...')
-        db_conn = None
-        while not db_conn:
+        self.wait_until(
+            'Database unavailable',
+            deadline,
+            lambda: probe(connection, connect_timeout)
+        )
+        self.stdout.write(self.style.SUCCESS('Database online!'))
+
+        if migrations:
+            self.wait_until(
+                'Migrations not applied yet',
+                deadline,
+                lambda: self.check_migrations(connection)
+            )
+            self.stdout.write(self.style.SUCCESS('Migrations applied!'))
+
+    @staticmethod
+    def check_migrations(connection):
+        plan = unapplied_migrations(connection)
+        if plan:
+            raise OperationalError(f'{len(plan)} migrations to apply')
+
+    def wait_until(self, message, deadline, check):
+        """Call `check` until it stops raising OperationalError"""
+        attempt = 0
+        while True:
             try:
-                db_conn = connections['default']
-            except OperationalError:
-                self.stdout.write(
-                    'Database unavailable, snoozing for 1 second....'
-                )
-                time.sleep(1)
+                check()
+                return
+            except OperationalError as exc:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(f'{message}: {exc}')
 
-        self.stdout.write(self.style.SUCCESS('Database online!'))
+            # Full jitter keeps restarting containers from retrying in step
+            delay = min(self.max_delay, self.initial_delay * 2 ** attempt)
+            delay = min(remaining, random.uniform(0, delay))
+            self.stdout.write(f'{message}, retrying in {delay:.3f}s...')
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,124 @@
+from django.db import migrations, transaction
+from django.db.models import Count, Min
+from django.db.models.functions import Lower, Trim
+
+BATCH_SIZE = 1000
+
+# Models whose duplicate names are merged, with their Recipe M2M field
+NAMED_MODELS = (
+    ('Tag', 'tags'),
+    ('Ingredient', 'ingredients'),
+)
+
+
+def normalize_name(name):
+    """A frozen copy of core.models.normalize_name"""
+    return name.strip().casefold()
+
+
+def fill_normalized_names(model):
+    """Set normalized_name in id ordered batches, one transaction each
+
+    Each batch is normalized with a single UPDATE using SQL LOWER and
+    TRIM, which agree with casefold and strip for ASCII names. Only the
+    rows where they differ, such as names with non-ASCII letters or
+    whitespace, are then updated one by one.
+    """
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                model.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:BATCH_SIZE]
+            )
+            if not ids:
+                return
+            batch = model.objects.filter(id__gt=last_id, id__lte=ids[-1])
+            batch.update(normalized_name=Lower(Trim('name')))
+            for pk, name, normalized_name in batch.values_list(
+                'id', 'name', 'normalized_name'
+            ):
+                if normalize_name(name) != normalized_name:
+                    model.objects.filter(id=pk).update(
+                        normalized_name=normalize_name(name)
+                    )
+        if len(ids) < BATCH_SIZE:
+            return
+        last_id = ids[-1]
+
+
+def merge_group(model, field, user_id, normalized_name, keep_id):
+    """Point the links of a duplicate group at its oldest row"""
+    through = field.remote_field.through
+    recipe_column = field.m2m_field_name() + '_id'
+    related_column = field.m2m_reverse_field_name() + '_id'
+    duplicate_ids = list(
+        model.objects.filter(user_id=user_id, normalized_name=normalized_name)
+        .exclude(id=keep_id)
+        .values_list('id', flat=True)
+    )
+    linked = set(
+        through.objects.filter(**{related_column: keep_id})
+        .values_list(recipe_column, flat=True)
+    )
+    move, drop = [], []
+    links = through.objects.filter(
+        **{f'{related_column}__in': duplicate_ids}
+    ).values_list('id', recipe_column)
+    for link_id, recipe_id in links:
+        if recipe_id in linked:
+            drop.append(link_id)
+        else:
+            move.append(link_id)
+            linked.add(recipe_id)
+
+    through.objects.filter(id__in=drop).delete()
+    through.objects.filter(id__in=move).update(**{related_column: keep_id})
+    model.objects.filter(id__in=duplicate_ids).delete()
+
+
+def merge_duplicates(model, field):
+    """Merge duplicate groups, a batch of groups per transaction"""
+    while True:
+        with transaction.atomic():
+            groups = list(
+                model.objects.values('user_id', 'normalized_name')
+                .annotate(rows=Count('id'), keep_id=Min('id'))
+                .filter(rows__gt=1)
+                .order_by()[:BATCH_SIZE]
+            )
+            for group in groups:
+                merge_group(
+                    model,
+                    field,
+                    group['user_id'],
+                    group['normalized_name'],
+                    group['keep_id']
+                )
+        if len(groups) < BATCH_SIZE:
+            return
+
+
+def merge_duplicate_names(apps, schema_editor):
+    Recipe = apps.get_model('core', 'Recipe')
+    for model_name, field_name in NAMED_MODELS:
+        model = apps.get_model('core', model_name)
+        fill_normalized_names(model)
+        merge_duplicates(model, Recipe._meta.get_field(field_name))
+
+
+class Migration(migrations.Migration):
+    # Batches commit one by one so large tables are never locked for long
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_normalized_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_names,
+            migrations.RunPython.noop
+        ),
+    ]
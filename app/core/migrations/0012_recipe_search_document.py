@@ -0,0 +1,77 @@
+# Generated by Django 2.1.15 on 2026-10-17 06:06
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+# A frozen copy of core.search.SEARCH_CONFIG
+SEARCH_CONFIG = 'english'
+
+
+def fill_search_documents(apps, schema_editor):
+    """Build every recipe document in id ordered batches"""
+    Recipe = apps.get_model('core', 'Recipe')
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            recipes = list(
+                Recipe.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .prefetch_related('tags', 'ingredients')[:BATCH_SIZE]
+            )
+            for recipe in recipes:
+                names = [recipe.title]
+                names += sorted(tag.name for tag in recipe.tags.all())
+                names += sorted(
+                    ingredient.name for ingredient in recipe.ingredients.all()
+                )
+                Recipe.objects.filter(id=recipe.id).update(
+                    search_document=' '.join(names).strip().casefold()
+                )
+        if len(recipes) < BATCH_SIZE:
+            break
+        last_id = recipes[-1].id
+
+    if schema_editor.connection.vendor == 'postgresql':
+        Recipe.objects.update(search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+            SearchVector('search_document', weight='B', config=SEARCH_CONFIG)
+        ))
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX recipe_search_vector_idx '
+            'ON core_recipe USING gin (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX recipe_search_vector_idx')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_user_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
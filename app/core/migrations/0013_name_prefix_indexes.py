@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Table of each model whose names are searched by prefix
+PREFIX_INDEXES = (
+    ('tag_user_prefix_idx', 'core_tag'),
+    ('ingredient_user_prefix_idx', 'core_ingredient'),
+)
+
+
+def create_prefix_indexes(apps, schema_editor):
+    """Index normalized names for LIKE 'prefix%' under any collation"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, table in PREFIX_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX {name} '
+            f'ON {table} (user_id, normalized_name varchar_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _ in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_recipe_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# Table of each model whose names are searched by prefix
+PREFIX_INDEXES = (
+    ('tag_user_prefix_idx', 'core_tag'),
+    ('ingredient_user_prefix_idx', 'core_ingredient'),
+)
+
+
+def create_c_indexes(apps, schema_editor):
+    """Index normalized names under the "C" collation
+
+    Unlike varchar_pattern_ops, which only serves LIKE 'prefix%', this
+    also serves the ORDER BY normalized_name COLLATE "C" of the prefix
+    lookup.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, table in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX {name}')
+        schema_editor.execute(
+            f'CREATE INDEX {name} '
+            f'ON {table} (user_id, normalized_name COLLATE "C")'
+        )
+
+
+def create_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, table in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX {name}')
+        schema_editor.execute(
+            f'CREATE INDEX {name} '
+            f'ON {table} (user_id, normalized_name varchar_pattern_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_name_id_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_c_indexes, create_pattern_indexes),
+    ]
@@ -4,13 +4,34 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
                                         PermissionsMixin
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+
+
+RECIPE_IMAGE_UPLOAD_DIR = 'uploads/recipe/'
 
 
 def recipe_image_file_path(instance, filename):
     ext = filename.split('.')[-1]
     filename = f'{uuid.uuid4()}.{ext}'
 
-    return os.path.join('uploads/recipe/', filename)
+    return os.path.join(RECIPE_IMAGE_UPLOAD_DIR, filename)
+
+
+def normalize_name(name):
+    """Case fold and trim a name so near duplicates compare equal"""
+    return name.strip().casefold()
+
+
+class NormalizedNameMixin:
+    """Keep normalized_name in step with name whenever the model is saved"""
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'normalized_name'}
+        super().save(*args, **kwargs)
 
 
 class UserManager(BaseUserManager):
@@ -47,26 +68,46 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
-class Tag(models.Model):
+class Tag(NormalizedNameMixin, models.Model):
     """Tag to be used for a recipe"""
     name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, editable=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        unique_together = (('user', 'normalized_name'),)
+        indexes = [
+            models.Index(
+                fields=['user', 'name', 'id'],
+                name='tag_user_name_id_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
 
-class Ingredient(models.Model):
+class Ingredient(NormalizedNameMixin, models.Model):
     """Ingredient to be used in a recipe"""
     name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, editable=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        unique_together = (('user', 'normalized_name'),)
+        indexes = [
+            models.Index(
+                fields=['user', 'name', 'id'],
+                name='ingredient_user_name_id_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -86,5 +127,80 @@ class Recipe(models.Model):
     tags = models.ManyToManyField('Tag')
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
 
+    IMAGE_PENDING = 'pending'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+    IMAGE_STATUS_CHOICES = (
+        (IMAGE_PENDING, 'Pending'),
+        (IMAGE_READY, 'Ready'),
+        (IMAGE_FAILED, 'Failed'),
+    )
+    image_status = models.CharField(
+        max_length=10,
+        choices=IMAGE_STATUS_CHOICES,
+        blank=True
+    )
+    image_thumbnail = models.ImageField(
+        null=True,
+        upload_to=recipe_image_file_path
+    )
+    image_medium = models.ImageField(
+        null=True,
+        upload_to=recipe_image_file_path
+    )
+    # Title, tag and ingredient names, kept current by core.search
+    search_document = models.TextField(blank=True, editable=False)
+    # Weighted tsvector of the document, only filled on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='recipe_user_id_idx'),
+            models.Index(
+                fields=['user', 'time_minutes', 'id'],
+                name='recipe_user_time_id_idx'
+            ),
+            models.Index(
+                fields=['user', 'price', 'id'],
+                name='recipe_user_price_id_idx'
+            ),
+            models.Index(
+                fields=['user', 'title', 'id'],
+                name='recipe_user_title_id_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.title
+
+
+class UserDataVersion(models.Model):
+    """Version of a user's recipes, tags and ingredients
+
+    Bumped whenever any of them or their links change, so list and
+    detail responses can be validated without re-running their queries.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def for_user(cls, user):
+        """Return the user's current version, starting one if needed"""
+        # A plain read first, as get_or_create reads from the primary
+        try:
+            return cls.objects.get(user_id=user.id)
+        except cls.DoesNotExist:
+            return cls.objects.get_or_create(user_id=user.id)[0]
+
+    @classmethod
+    def bump(cls, user_id):
+        """Invalidate the user's version, if one has been handed out"""
+        cls.objects.filter(user_id=user_id).update(
+            version=models.F('version') + 1,
+            updated_at=timezone.now()
+        )
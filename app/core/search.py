@@ -0,0 +1,99 @@
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, \
+                                           SearchVector
+from django.db import connection
+from django.db.models import Case, DecimalField, F, TextField, Value, When
+from django.db.models.functions import Cast
+
+from core.models import Recipe, normalize_name
+
+SEARCH_CONFIG = 'english'
+REFRESH_BATCH_SIZE = 500
+LINKED_NAME_FIELDS = ('tags', 'ingredients')
+
+
+def uses_full_text_search():
+    """PostgreSQL ranks against the indexed tsvector, others fall back"""
+    return connection.vendor == 'postgresql'
+
+
+def _search_vector():
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('search_document', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def build_search_documents(recipe_ids):
+    """Return recipe id mapped to its title, tag and ingredient names"""
+    parts = defaultdict(list)
+    recipes = Recipe.objects.filter(id__in=recipe_ids)
+    for recipe_id, title in recipes.values_list('id', 'title'):
+        parts[recipe_id].append(title)
+    for field_name in LINKED_NAME_FIELDS:
+        field = Recipe._meta.get_field(field_name)
+        related_column = field.m2m_reverse_field_name()
+        links = field.remote_field.through.objects.filter(
+            **{f'{field.m2m_field_name()}__in': list(parts)}
+        ).order_by(f'{related_column}__name')
+        for recipe_id, name in links.values_list(
+            field.m2m_field_name(), f'{related_column}__name'
+        ):
+            parts[recipe_id].append(name)
+
+    return {
+        recipe_id: normalize_name(' '.join(names))
+        for recipe_id, names in parts.items()
+    }
+
+
+def refresh_search_documents(recipe_ids):
+    """Rebuild the search document of the given recipes
+
+    Documents are written with one UPDATE per batch, plus one to rebuild
+    the tsvector from them on PostgreSQL.
+    """
+    recipe_ids = list(recipe_ids)
+    for start in range(0, len(recipe_ids), REFRESH_BATCH_SIZE):
+        documents = build_search_documents(
+            recipe_ids[start:start + REFRESH_BATCH_SIZE]
+        )
+        if not documents:
+            continue
+
+        recipes = Recipe.objects.filter(id__in=list(documents))
+        recipes.update(search_document=Case(
+            *[
+                When(id=recipe_id, then=Value(document))
+                for recipe_id, document in documents.items()
+            ],
+            output_field=TextField()
+        ))
+        if uses_full_text_search():
+            recipes.update(search_vector=_search_vector())
+
+
+def search_recipes(queryset, text):
+    """Filter recipes to those matching every word of the text
+
+    On PostgreSQL matches come from the GIN indexed tsvector and are
+    annotated with their rank. The rank is cast from real to numeric so
+    it survives a round trip through a pagination cursor exactly, and
+    tied ranks compare equal. Elsewhere each word is matched as a
+    substring of the search document, which needs a scan.
+    """
+    if uses_full_text_search():
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(
+                SearchRank(F('search_vector'), query),
+                DecimalField(max_digits=12, decimal_places=6)
+            )
+        )
+
+    for word in normalize_name(text).split():
+        queryset = queryset.filter(search_document__contains=word)
+
+    return queryset
@@ -0,0 +1,47 @@
+import multiprocessing
+
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+from gunicorn.app.base import BaseApplication
+
+
+def default_workers():
+    return multiprocessing.cpu_count() * 2 + 1
+
+
+def close_connections(server, worker):
+    """Fork workers without the master's database connections"""
+    connections.close_all()
+
+
+class Server(BaseApplication):
+    """Gunicorn application serving the project's WSGI handler
+
+    With `preload_app` the handler and every view are loaded in the
+    master before it forks, so workers share that memory copy-on-write.
+    With `asgi` the ASGI handler is served by uvicorn workers instead.
+    """
+
+    def __init__(self, options, asgi=False):
+        self.options = options
+        self.asgi = asgi
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set('pre_fork', close_connections)
+
+    def load(self):
+        """Load the application the app.wsgi or app.asgi module exposes"""
+        application = import_string(
+            settings.ASGI_APPLICATION if self.asgi
+            else settings.WSGI_APPLICATION
+        )
+        # Import the views through the URLconf now rather than per request
+        import_module(settings.ROOT_URLCONF)
+
+        return application
@@ -0,0 +1,120 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, \
+                                     post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core import authentication
+from core.search import refresh_search_documents
+from core.models import User, Recipe, Tag, Ingredient, UserDataVersion
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def evict_cached_token(sender, instance, **kwargs):
+    """Forget cached credentials of a changed, deleted or regenerated token"""
+    authentication.token_cache.revoke(instance.key)
+
+
+def _auth_state(user):
+    # Read from __dict__ so deferred fields are not loaded
+    return (user.__dict__.get('is_active'), user.__dict__.get('password'))
+
+
+@receiver(post_init, sender=User)
+def remember_auth_state(sender, instance, **kwargs):
+    instance._loaded_auth_state = _auth_state(instance)
+
+
+@receiver(post_save, sender=User)
+def evict_cached_user_tokens(sender, instance, created, **kwargs):
+    """Forget cached credentials when is_active or the password changes"""
+    state = _auth_state(instance)
+    changed = state != instance._loaded_auth_state
+    instance._loaded_auth_state = state
+    if created or not changed:
+        return
+
+    keys = Token.objects.filter(user=instance).values_list('key', flat=True)
+    for key in keys:
+        authentication.token_cache.revoke(key)
+
+
+@receiver(post_save, sender=User)
+def create_user_data_version(sender, instance, created, using, **kwargs):
+    """Start every new user on a stored version"""
+    if created:
+        UserDataVersion.objects.using(using).create(user=instance)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def bump_user_data_version(sender, instance, **kwargs):
+    """Invalidate the owner's version when their recipe data changes"""
+    UserDataVersion.bump(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def bump_user_data_version_on_links(sender, instance, action, **kwargs):
+    """Invalidate the owner's version when recipe links change"""
+    if action.startswith('post_'):
+        UserDataVersion.bump(instance.user_id)
+
+
+def _linked_recipe_ids(instance):
+    field_name = 'tags' if isinstance(instance, Tag) else 'ingredients'
+
+    return list(
+        Recipe.objects.filter(**{field_name: instance})
+        .values_list('id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_recipe_search_document(sender, instance, update_fields,
+                                   **kwargs):
+    """Rebuild the search document when a recipe title may have changed"""
+    if update_fields is None or 'title' in update_fields:
+        refresh_search_documents([instance.id])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def refresh_linked_search_documents(sender, instance, created, **kwargs):
+    """Rebuild the documents of recipes linked to a renamed name"""
+    if not created:
+        refresh_search_documents(_linked_recipe_ids(instance))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def remember_linked_recipes(sender, instance, **kwargs):
+    """Note linked recipes before the delete cascades to their links"""
+    instance.search_recipe_ids = _linked_recipe_ids(instance)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def refresh_unlinked_search_documents(sender, instance, **kwargs):
+    """Rebuild the documents of recipes that lost a deleted name"""
+    refresh_search_documents(getattr(instance, 'search_recipe_ids', []))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def refresh_search_documents_on_links(sender, instance, action, reverse,
+                                      pk_set, **kwargs):
+    """Rebuild the documents of recipes whose links changed"""
+    if not reverse:
+        if action.startswith('post_'):
+            refresh_search_documents([instance.id])
+    elif action == 'pre_clear':
+        instance.search_recipe_ids = _linked_recipe_ids(instance)
+    elif action == 'post_clear':
+        refresh_search_documents(instance.search_recipe_ids)
+    elif action.startswith('post_'):
+        refresh_search_documents(pk_set)
@@ -0,0 +1,50 @@
+import logging
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKGROUND_TASK_WORKERS,
+                thread_name_prefix='background-task'
+            )
+
+    return _executor
+
+
+def _run_task(func, args):
+    """Run a task on a worker thread with its own database connections"""
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Background task %s failed', func.__name__)
+    finally:
+        connections.close_all()
+
+
+def enqueue(func, *args):
+    """Run `func(*args)` in the background once the transaction commits
+
+    With BACKGROUND_TASK_WORKERS set to 0 the task runs inline instead,
+    which stands in for the worker pool in tests and management commands.
+    """
+    if not settings.BACKGROUND_TASK_WORKERS:
+        func(*args)
+        return
+
+    transaction.on_commit(
+        lambda: _get_executor().submit(_run_task, func, args)
+    )
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import threading
+
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.asgi import ASGIHandler, get_environ
+
+
+def http_scope(method='GET', path='/', query_string=b'', headers=()):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'path': path,
+        'query_string': query_string,
+        'headers': list(headers),
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+
+
+def call(handler, scope, body=b'', received=None):
+    """Run one request through the handler and return the sent messages
+
+    `body` may be a list of chunks, each sent as its own message, and
+    the messages the handler read are appended to `received`.
+    """
+    chunks = body if isinstance(body, list) else [body]
+    messages = [
+        {'type': 'http.request', 'body': chunk, 'more_body': True}
+        for chunk in chunks
+    ]
+    messages[-1]['more_body'] = False
+    received = [] if received is None else received
+    sent = []
+
+    async def receive():
+        received.append(messages.pop(0))
+        return received[-1]
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.new_event_loop().run_until_complete(handler(scope, receive, send))
+
+    return sent
+
+
+def echo_app(environ, start_response):
+    """WSGI app echoing the request and the thread it ran on"""
+    start_response('201 Created', [('Content-Type', 'application/json')])
+    return [json.dumps({
+        'method': environ['REQUEST_METHOD'],
+        'path': environ['PATH_INFO'],
+        'query': environ['QUERY_STRING'],
+        'body': environ['wsgi.input'].read().decode(),
+        'length': environ['CONTENT_LENGTH'],
+        'thread': threading.current_thread().name,
+    }).encode()]
+
+
+class StreamingResponse:
+    streaming = True
+    closed = False
+
+    def __iter__(self):
+        return iter([b'[1,', b'', b'2]'])
+
+    def close(self):
+        self.closed = True
+
+
+class ASGIHandlerTests(SimpleTestCase):
+
+    def test_request_is_run_by_the_wsgi_app(self):
+        """Given"""
+        handler = ASGIHandler(echo_app)
+
+        """When"""
+        start, body = call(
+            handler,
+            http_scope('POST', '/api/recipe/tags/', b'page=2'),
+            b'name=Vegan'
+        )
+
+        """Then"""
+        self.assertEqual(start['status'], 201)
+        self.assertEqual(
+            start['headers'],
+            [(b'content-type', b'application/json')]
+        )
+        data = json.loads(body['body'])
+        self.assertEqual(data['path'], '/api/recipe/tags/')
+        self.assertEqual(data['query'], 'page=2')
+        self.assertEqual(data['body'], 'name=Vegan')
+
+    def test_safe_methods_run_on_the_read_pool(self):
+        """Given"""
+        handler = ASGIHandler(echo_app, read_threads=1, write_threads=1)
+
+        """When"""
+        reads = [call(handler, http_scope(method))[1] for method in (
+            'GET', 'HEAD', 'OPTIONS'
+        )]
+        write = call(handler, http_scope('PATCH'))[1]
+
+        """Then"""
+        for read in reads:
+            self.assertTrue(
+                json.loads(read['body'])['thread'].startswith('asgi-read')
+            )
+        self.assertTrue(
+            json.loads(write['body'])['thread'].startswith('asgi-write')
+        )
+
+    def test_streaming_response_is_sent_in_chunks_and_closed(self):
+        """Given"""
+        response = StreamingResponse()
+
+        def streaming_app(environ, start_response):
+            start_response('200 OK', [])
+            return response
+
+        """When"""
+        sent = call(ASGIHandler(streaming_app), http_scope())
+
+        """Then"""
+        self.assertEqual(
+            [message.get('body', b'') for message in sent[1:]],
+            [b'[1,', b'2]', b'']
+        )
+        self.assertFalse(sent[-1].get('more_body', False))
+        self.assertTrue(response.closed)
+
+    def test_django_handles_requests(self):
+        """When"""
+        start, body = call(
+            ASGIHandler(),
+            http_scope(path=reverse('recipe:recipe-list'))
+        )
+
+        """Then"""
+        self.assertEqual(start['status'], 401)
+
+    def test_environ_combines_repeated_headers(self):
+        """When"""
+        body = BytesIO(b'body')
+        environ = get_environ(http_scope(headers=[
+            (b'content-type', b'text/plain'),
+            (b'content-length', b'999'),
+            (b'accept', b'text/html'),
+            (b'accept', b'application/json'),
+        ]), body)
+
+        """Then"""
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(environ['CONTENT_LENGTH'], '4')
+        self.assertEqual(
+            environ['HTTP_ACCEPT'],
+            'text/html,application/json'
+        )
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=4)
+    def test_body_is_spooled_as_it_arrives(self):
+        """When"""
+        start, body = call(
+            ASGIHandler(echo_app),
+            http_scope('POST'),
+            [b'name=', b'Chick', b'peas']
+        )
+
+        """Then"""
+        data = json.loads(body['body'])
+        self.assertEqual(data['body'], 'name=Chickpeas')
+        self.assertEqual(data['length'], '14')
+
+    def test_declared_oversized_body_is_rejected_unread(self):
+        """Given"""
+        received = []
+        scope = http_scope('POST', headers=[(b'content-length', b'11')])
+
+        """When"""
+        start, body = call(
+            ASGIHandler(echo_app, max_body_size=10),
+            scope,
+            b'x' * 11,
+            received
+        )
+
+        """Then"""
+        self.assertEqual(start['status'], 413)
+        self.assertEqual(received, [])
+
+    def test_streamed_oversized_body_is_rejected_at_the_limit(self):
+        """Given"""
+        received = []
+
+        """When"""
+        start, body = call(
+            ASGIHandler(echo_app, max_body_size=10),
+            http_scope('POST'),
+            [b'x' * 6, b'x' * 6, b'x' * 6],
+            received
+        )
+
+        """Then"""
+        self.assertEqual(start['status'], 413)
+        self.assertEqual(len(received), 2)
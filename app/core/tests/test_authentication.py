@@ -0,0 +1,277 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, RequestFactory, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from core import authentication
+from core.authentication import CachedTokenAuthentication, TokenCache
+from core.cache import LRUCache
+
+
+def token_request(key):
+    return RequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {key}')
+
+
+class LRUCacheTests(TestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Given"""
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+
+        """When"""
+        cache.set('c', 3)
+
+        """Then"""
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_entries_are_evicted_past_max_bytes(self):
+        """Given"""
+        cache = LRUCache(max_size=10, ttl=60, max_bytes=10)
+        cache.set('a', b'x' * 4)
+        cache.set('b', b'x' * 4)
+
+        """When"""
+        cache.set('c', b'x' * 4)
+        cache.set('d', b'x' * 11)
+
+        """Then"""
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(cache.get('c'), b'x' * 4)
+        self.assertEqual(cache.bytes, 8)
+
+    @patch('time.monotonic')
+    def test_expired_entry_is_a_miss(self, monotonic):
+        """Given"""
+        monotonic.return_value = 100
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+
+        """When"""
+        monotonic.return_value = 161
+
+        """Then"""
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(len(cache), 0)
+
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+
+def shared_token_cache():
+    return TokenCache(
+        local_max_size=10,
+        local_ttl=60,
+        shared_cache='default',
+        shared_ttl=60,
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        patcher = patch.object(
+            authentication, 'token_cache', shared_token_cache()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.token = Token.objects.create(user=self.user)
+
+    def test_second_lookup_runs_no_queries(self):
+        """Given"""
+        CachedTokenAuthentication().authenticate(token_request(self.token))
+
+        """When"""
+        with self.assertNumQueries(0):
+            user, token = CachedTokenAuthentication().authenticate(
+                token_request(self.token)
+            )
+
+        """Then"""
+        self.assertEqual(user, self.user)
+        self.assertEqual(token, self.token)
+
+    def test_deleted_token_is_evicted(self):
+        """Given"""
+        key = self.token.key
+        CachedTokenAuthentication().authenticate(token_request(key))
+
+        """When"""
+        self.token.delete()
+
+        """Then"""
+        with self.assertRaises(AuthenticationFailed):
+            CachedTokenAuthentication().authenticate(token_request(key))
+
+    def test_deactivated_user_is_evicted(self):
+        """Given"""
+        CachedTokenAuthentication().authenticate(token_request(self.token))
+
+        """When"""
+        self.user.is_active = False
+        self.user.save()
+
+        """Then"""
+        with self.assertRaises(AuthenticationFailed):
+            CachedTokenAuthentication().authenticate(
+                token_request(self.token)
+            )
+
+    def test_saving_user_without_auth_changes_keeps_tokens(self):
+        """Given"""
+        CachedTokenAuthentication().authenticate(token_request(self.token))
+
+        """When"""
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+        """Then"""
+        with self.assertNumQueries(0):
+            CachedTokenAuthentication().authenticate(
+                token_request(self.token)
+            )
+
+    def test_password_change_evicts_tokens(self):
+        """Given"""
+        CachedTokenAuthentication().authenticate(token_request(self.token))
+
+        """When"""
+        self.user.set_password('Password2')
+        self.user.save()
+
+        """Then"""
+        with self.assertNumQueries(1):
+            CachedTokenAuthentication().authenticate(
+                token_request(self.token)
+            )
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        """Given"""
+        user, _ = CachedTokenAuthentication().authenticate(
+            token_request(self.token)
+        )
+
+        """When"""
+        user.name = 'Changed in a request'
+
+        """Then"""
+        cached_user, _ = CachedTokenAuthentication().authenticate(
+            token_request(self.token)
+        )
+        self.assertEqual(cached_user.name, '')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SharedTokenCacheTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.cache = shared_token_cache()
+        user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.token = Token.objects.create(user=user)
+
+    def test_shared_tier_fills_the_local_tier(self):
+        """Given"""
+        self.cache.set(
+            self.token.key,
+            (self.token.user, self.token),
+            self.cache.marker(self.token.key)
+        )
+        self.cache.local.clear()
+
+        """When"""
+        credentials = self.cache.get(self.token.key)
+
+        """Then"""
+        self.assertEqual(credentials, (self.token.user, self.token))
+        self.assertEqual(len(self.cache.local), 1)
+
+    def test_revoke_evicts_both_tiers(self):
+        """Given"""
+        self.cache.set(
+            self.token.key,
+            (self.token.user, self.token),
+            self.cache.marker(self.token.key)
+        )
+
+        """When"""
+        self.cache.revoke(self.token.key)
+
+        """Then"""
+        self.assertIsNone(self.cache.get(self.token.key))
+
+    def test_raw_token_is_not_used_as_shared_key(self):
+        """When"""
+        self.cache.set(
+            self.token.key,
+            (self.token.user, self.token),
+            self.cache.marker(self.token.key)
+        )
+
+        """Then"""
+        self.assertIsNone(caches['default'].get(self.token.key))
+
+    def test_revocation_reaches_other_processes_local_tiers(self):
+        """Given"""
+        other_process = shared_token_cache()
+        credentials = (self.token.user, self.token)
+        other_process.set(
+            self.token.key,
+            credentials,
+            other_process.marker(self.token.key)
+        )
+        self.assertEqual(other_process.get(self.token.key), credentials)
+
+        """When"""
+        self.cache.revoke(self.token.key)
+
+        """Then"""
+        self.assertIsNone(other_process.get(self.token.key))
+
+    def test_entry_looked_up_before_a_revocation_is_not_served(self):
+        """Given"""
+        marker = self.cache.marker(self.token.key)
+
+        """When"""
+        self.cache.revoke(self.token.key)
+        self.cache.set(self.token.key, (self.token.user, self.token), marker)
+
+        """Then"""
+        self.assertIsNone(self.cache.get(self.token.key))
+
+    def test_nothing_is_cached_without_a_shared_cache(self):
+        """Given"""
+        cache = TokenCache(local_max_size=10, local_ttl=60)
+
+        """When"""
+        cache.set(
+            self.token.key,
+            (self.token.user, self.token),
+            cache.marker(self.token.key)
+        )
+
+        """Then"""
+        self.assertIsNone(cache.get(self.token.key))
+        self.assertEqual(len(cache.local), 0)
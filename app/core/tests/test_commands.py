@@ -1,25 +1,164 @@
+from importlib.util import find_spec
+from io import StringIO
+from unittest import skipUnless
 from unittest.mock import patch
 
+from django.conf import settings
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.db.utils import OperationalError
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 
+WAIT_FOR_DB = 'core.management.commands.wait_for_db'
+
+
+class FakeClock:
+    """Monotonic clock that only moves when slept on"""
+
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+def wait_for_db(*args, **options):
+    return call_command('wait_for_db', *args, stdout=StringIO(), **options)
+
+
+@patch('random.uniform', lambda low, high: high)
+class WaitForDbTests(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        for name in ('monotonic', 'sleep'):
+            patcher = patch(f'time.{name}', getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_wait_for_db_runs_a_query(self):
+        """When"""
+        with CaptureQueriesContext(connection) as queries:
+            wait_for_db()
+
+        """Then"""
+        self.assertEqual(queries.captured_queries[0]['sql'], 'SELECT 1')
+        self.assertEqual(self.clock.sleeps, [])
+
+    @patch(f'{WAIT_FOR_DB}.probe')
+    def test_wait_for_db_backs_off_exponentially(self, probe):
+        """Given"""
+        probe.side_effect = [OperationalError] * 5 + [None]
+
+        """When"""
+        wait_for_db(initial_delay=0.05)
+
+        """Then"""
+        self.assertEqual(probe.call_count, 6)
+        self.assertEqual(self.clock.sleeps, [0.05, 0.1, 0.2, 0.4, 0.8])
+
+    @patch(f'{WAIT_FOR_DB}.probe')
+    def test_wait_for_db_caps_the_delay(self, probe):
+        """Given"""
+        probe.side_effect = [OperationalError] * 4 + [None]
+
+        """When"""
+        wait_for_db(initial_delay=1, max_delay=3)
+
+        """Then"""
+        self.assertEqual(self.clock.sleeps, [1, 2, 3, 3])
+
+    @patch(f'{WAIT_FOR_DB}.probe', side_effect=OperationalError('refused'))
+    def test_wait_for_db_fails_at_the_deadline(self, probe):
+        """When"""
+        with self.assertRaisesMessage(CommandError, 'refused'):
+            wait_for_db(timeout=1, initial_delay=0.3, max_delay=10)
+
+        """Then"""
+        self.assertEqual(self.clock.sleeps, [0.3, 0.6, 0.1])
+        self.assertEqual(self.clock.now, 1)
+
+    @patch(f'{WAIT_FOR_DB}.unapplied_migrations')
+    def test_wait_for_db_waits_for_migrations(self, unapplied_migrations):
+        """Given"""
+        unapplied_migrations.side_effect = [['0015_recipe'], []]
+
+        """When"""
+        wait_for_db(migrations=True, initial_delay=0.05)
+
+        """Then"""
+        self.assertEqual(unapplied_migrations.call_count, 2)
+        self.assertEqual(self.clock.sleeps, [0.05])
+
+
+@skipUnless(find_spec('gunicorn'), 'gunicorn is not installed')
 class CommandTest(TestCase):
 
-    def test_wait_for_db_ready(self):
-        """Test waiting for db when its available"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
+    @patch('core.management.commands.serve.Server')
+    def test_serve_passes_tuning_options(self, server):
+        """When"""
+        call_command(
+            'serve',
+            workers=3,
+            threads=8,
+            keepalive=10,
+            max_requests=1000,
+            preload=False
+        )
+
+        """Then"""
+        options = server.call_args[0][0]
+        self.assertEqual(options['workers'], 3)
+        self.assertEqual(options['worker_class'], 'gthread')
+        self.assertEqual(options['threads'], 8)
+        self.assertEqual(options['keepalive'], 10)
+        self.assertEqual(options['max_requests_jitter'], 100)
+        self.assertFalse(options['preload_app'])
+        server.return_value.run.assert_called_once_with()
+
+    def test_server_preloads_by_default(self):
+        """Given"""
+        from core.management.commands.serve import Command as ServeCommand
+        from core.server import Server, close_connections
+
+        """When"""
+        parser = ServeCommand().create_parser('manage.py', 'serve')
+        options = ServeCommand.get_server_options(vars(parser.parse_args([])))
+        server = Server(options)
+
+        """Then"""
+        self.assertTrue(server.cfg.preload_app)
+        self.assertEqual(server.cfg.threads, settings.SERVER['THREADS'])
+        self.assertIs(server.cfg.pre_fork, close_connections)
+
+    def test_server_loads_the_wsgi_module_application(self):
+        """Given"""
+        from app import wsgi
+        from core.server import Server
+
+        """When"""
+        application = Server({'preload_app': False}).load()
 
-            self.assertEqual(gi.call_count, 1)
+        """Then"""
+        self.assertIs(application, wsgi.application)
 
-    @patch('time.sleep', return_value=True)
-    def test_wait_for_db(self, timesleep):
-        """Test waiting for the db connection"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
+    @patch('core.management.commands.serve.Server')
+    def test_serve_asgi_uses_uvicorn_workers(self, server):
+        """When"""
+        call_command('serve', asgi=True)
 
-            self.assertEqual(gi.call_count, 6)
+        """Then"""
+        options = server.call_args[0][0]
+        self.assertEqual(
+            options['worker_class'],
+            'uvicorn.workers.UvicornWorker'
+        )
+        self.assertTrue(server.call_args[1]['asgi'])
@@ -0,0 +1,177 @@
+import threading
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.backends.pooled_postgresql.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+
+def fake_pool(**options):
+    opened = []
+
+    def connect():
+        connection = FakeConnection()
+        opened.append(connection)
+        return connection
+
+    pool = ConnectionPool(
+        connect=connect,
+        close=lambda connection: connection.close(),
+        check=lambda connection: connection.healthy,
+        **options
+    )
+
+    return pool, opened
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def test_released_connection_is_reused(self):
+        """Given"""
+        pool, opened = fake_pool()
+        connection = pool.acquire()
+
+        """When"""
+        pool.release(connection)
+
+        """Then"""
+        self.assertIs(pool.acquire(), connection)
+        self.assertEqual(len(opened), 1)
+
+    def test_fill_opens_min_size_connections(self):
+        """Given"""
+        pool, opened = fake_pool(min_size=3)
+
+        """When"""
+        pool.fill()
+
+        """Then"""
+        self.assertEqual(len(opened), 3)
+        self.assertEqual(pool.idle, 3)
+
+    def test_checkout_times_out_when_exhausted(self):
+        """Given"""
+        pool, _ = fake_pool(max_size=1, timeout=0.01)
+        pool.acquire()
+
+        """Then"""
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+    def test_waiting_checkout_gets_released_connection(self):
+        """Given"""
+        pool, _ = fake_pool(max_size=1, timeout=5)
+        connection = pool.acquire()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(
+            pool.acquire()
+        ))
+
+        """When"""
+        waiter.start()
+        pool.release(connection)
+        waiter.join(5)
+
+        """Then"""
+        self.assertEqual(acquired, [connection])
+
+    def test_unhealthy_connection_is_replaced(self):
+        """Given"""
+        pool, opened = fake_pool()
+        connection = pool.acquire()
+        pool.release(connection)
+
+        """When"""
+        connection.healthy = False
+        replacement = pool.acquire()
+
+        """Then"""
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_recently_released_connection_is_not_checked(self):
+        """Given"""
+        pool, _ = fake_pool(check_after=60)
+        connection = pool.acquire()
+        pool.release(connection)
+
+        """When"""
+        connection.healthy = False
+
+        """Then"""
+        self.assertIs(pool.acquire(), connection)
+
+    @patch('time.monotonic')
+    def test_idle_connections_are_recycled_down_to_min_size(self, monotonic):
+        """Given"""
+        monotonic.return_value = 0
+        pool, opened = fake_pool(min_size=1, max_idle=10)
+        first, second, third = pool.acquire(), pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+
+        """When"""
+        monotonic.return_value = 20
+        pool.release(third)
+
+        """Then"""
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+        self.assertFalse(third.closed)
+        self.assertEqual(pool.size, 1)
+
+    @patch('time.monotonic')
+    def test_connections_past_their_lifetime_are_closed(self, monotonic):
+        """Given"""
+        monotonic.return_value = 0
+        pool, _ = fake_pool(max_lifetime=100)
+        connection = pool.acquire()
+
+        """When"""
+        monotonic.return_value = 101
+        pool.release(connection)
+
+        """Then"""
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 0)
+
+    def test_failed_connect_frees_its_slot(self):
+        """Given"""
+        pool = ConnectionPool(
+            connect=lambda: 1 / 0,
+            close=lambda connection: None,
+            max_size=1,
+            timeout=0.01
+        )
+
+        """Then"""
+        for _ in range(2):
+            with self.assertRaises(ZeroDivisionError):
+                pool.acquire()
+        self.assertEqual(pool.size, 0)
+
+    def test_connection_failing_reset_is_discarded(self):
+        """Given"""
+        pool, _ = fake_pool()
+        pool._reset = lambda connection: not connection.closed
+        connection = pool.acquire()
+
+        """When"""
+        connection.closed = True
+        pool.release(connection)
+
+        """Then"""
+        self.assertEqual(pool.size, 0)
+        self.assertEqual(pool.idle, 0)
@@ -0,0 +1,190 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import db_router
+from core.db_router import ReplicaRouter, ReplicaRoutingMiddleware
+from core.models import Recipe, Tag
+
+TAGS_URL = reverse('recipe:tag-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+EXPORT_URL = reverse('recipe:recipe-export')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(TestCase):
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.routed = []
+
+    def tearDown(self):
+        db_router.use_primary()
+
+    def handle(self, method, write=False):
+        def view(request):
+            if write:
+                self.router.db_for_write(Tag)
+            self.routed.append(self.router.db_for_read(Tag))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)('/')
+        ReplicaRoutingMiddleware(view)(request)
+
+    def test_safe_method_requests_read_from_a_replica(self):
+        """When"""
+        self.handle('get')
+        self.handle('head')
+
+        """Then"""
+        self.assertEqual(self.routed, ['replica', 'replica'])
+
+    def test_unsafe_method_requests_read_from_the_primary(self):
+        """When"""
+        self.handle('post')
+
+        """Then"""
+        self.assertEqual(self.routed, ['default'])
+
+    def test_request_reads_from_the_primary_after_writing(self):
+        """When"""
+        self.handle('get', write=True)
+
+        """Then"""
+        self.assertEqual(self.routed, ['default'])
+
+    def test_streaming_response_reads_from_the_replica_until_closed(self):
+        """Given"""
+        def stream():
+            self.routed.append(self.router.db_for_read(Tag))
+            yield b''
+
+        request = RequestFactory().get('/')
+
+        """When"""
+        response = ReplicaRoutingMiddleware(
+            lambda request: StreamingHttpResponse(stream())
+        )(request)
+        list(response)
+        response.close()
+
+        """Then"""
+        self.assertEqual(self.routed, ['replica'])
+        self.assertEqual(self.router.db_for_read(Tag), 'default')
+
+    def test_reads_outside_requests_use_the_primary(self):
+        """When"""
+        self.handle('get')
+
+        """Then"""
+        self.assertEqual(self.router.db_for_read(Tag), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_reads_are_not_routed_without_replicas(self):
+        """When"""
+        self.handle('get')
+
+        """Then"""
+        self.assertEqual(self.routed, [None])
+
+
+@skipUnless(
+    'test_replica' in settings.DATABASES,
+    'Run with --settings=app.test_settings'
+)
+@override_settings(DATABASE_REPLICAS=['test_replica'])
+class ReplicaRoutingDatabaseTests(TestCase):
+    """Reads against the test_replica database app.test_settings adds
+
+    Nothing replicates into it, so rows written to only one database
+    show which one a request read from.
+    """
+    multi_db = True
+
+    def setUp(self):
+        self.replica = 'test_replica'
+        self.user = get_user_model().objects.create_user(
+            'test@londonappdev.com',
+            'testpass'
+        )
+        get_user_model().objects.get(pk=self.user.pk).save(using=self.replica)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_reads_use_the_primary_without_replicas(self):
+        """Given"""
+        Tag.objects.create(user=self.user, name='Primary')
+
+        """When"""
+        res = self.client.get(TAGS_URL)
+
+        """Then"""
+        names = [tag['name'] for tag in res.data['results']]
+        self.assertEqual(names, ['Primary'])
+
+    def test_list_reads_from_the_replica(self):
+        """Given"""
+        Tag.objects.create(user=self.user, name='Primary')
+        Tag.objects.using(self.replica).create(user=self.user, name='Replica')
+
+        """When"""
+        res = self.client.get(TAGS_URL)
+
+        """Then"""
+        names = [tag['name'] for tag in res.data['results']]
+        self.assertEqual(names, ['Replica'])
+
+    def test_recipe_list_reads_from_the_replica(self):
+        """Given"""
+        Recipe.objects.using(self.replica).create(
+            user=self.user,
+            title='Replica',
+            time_minutes=5,
+            price=1.00
+        )
+
+        """When"""
+        res = self.client.get(RECIPES_URL)
+
+        """Then"""
+        titles = [recipe['title'] for recipe in res.data['results']]
+        self.assertEqual(titles, ['Replica'])
+
+    def test_create_writes_to_the_primary(self):
+        """When"""
+        self.client.post(TAGS_URL, {'name': 'Vegan'})
+
+        """Then"""
+        self.assertTrue(Tag.objects.filter(name='Vegan').exists())
+        self.assertFalse(
+            Tag.objects.using(self.replica).filter(name='Vegan').exists()
+        )
+
+    def test_streaming_export_reads_from_the_replica(self):
+        """Given"""
+        Recipe.objects.create(
+            user=self.user,
+            title='Primary',
+            time_minutes=5,
+            price=1.00
+        )
+        Recipe.objects.using(self.replica).create(
+            user=self.user,
+            title='Replica',
+            time_minutes=5,
+            price=1.00
+        )
+
+        """When"""
+        res = self.client.get(EXPORT_URL)
+        content = b''.join(res.streaming_content)
+
+        """Then"""
+        self.assertIn(b'Replica', content)
+        self.assertNotIn(b'Primary', content)
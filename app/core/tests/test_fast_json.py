@@ -0,0 +1,105 @@
+import datetime
+import uuid
+
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import fast_json
+from core.fast_json import FastJSONParser, FastJSONRenderer
+
+
+def sample_payload():
+    return {
+        'id': 1,
+        'title': 'Crème brûlée \u2028 with a line separator',
+        'price': Decimal('5.50'),
+        'label': gettext_lazy('Recipe'),
+        'created': datetime.datetime(
+            2020, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc
+        ),
+        'day': datetime.date(2020, 1, 2),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'tags': [1, 2, 3],
+        'nested': {'ratio': 0.5, 'empty': None, 'flag': True},
+    }
+
+
+class FastJSONRendererTests(TestCase):
+
+    def test_output_matches_stdlib_renderer(self):
+        """When"""
+        expected = JSONRenderer().render(sample_payload())
+
+        """Then"""
+        self.assertEqual(FastJSONRenderer().render(sample_payload()), expected)
+        with override_settings(JSON_BACKEND='json'):
+            self.assertEqual(
+                FastJSONRenderer().render(sample_payload()),
+                expected
+            )
+
+    def test_stdlib_is_used_without_orjson(self):
+        """When"""
+        with patch.object(fast_json, 'orjson', None):
+            output = FastJSONRenderer().render(sample_payload())
+
+        """Then"""
+        self.assertEqual(output, JSONRenderer().render(sample_payload()))
+
+    def test_indent_and_large_integers_fall_back(self):
+        """Given"""
+        payload = {'big': 2 ** 70}
+
+        """Then"""
+        self.assertEqual(
+            FastJSONRenderer().render(payload),
+            JSONRenderer().render(payload)
+        )
+        self.assertEqual(
+            FastJSONRenderer().render(payload, 'application/json; indent=2'),
+            JSONRenderer().render(payload, 'application/json; indent=2')
+        )
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class FastJSONParserTests(TestCase):
+
+    def _parse(self, body, encoding='utf-8'):
+        return FastJSONParser().parse(
+            BytesIO(body),
+            parser_context={'encoding': encoding}
+        )
+
+    def test_parses_like_stdlib_parser(self):
+        """Given"""
+        body = '{"title": "Crème", "price": 5.5, "tags": [1, 2]}'.encode()
+
+        """Then"""
+        self.assertEqual(
+            self._parse(body),
+            JSONParser().parse(
+                BytesIO(body),
+                parser_context={'encoding': 'utf-8'}
+            )
+        )
+
+    def test_other_charsets_are_decoded(self):
+        self.assertEqual(
+            self._parse('{"title": "Crème"}'.encode('latin-1'), 'latin-1'),
+            {'title': 'Crème'}
+        )
+
+    def test_invalid_json_is_a_parse_error(self):
+        for body in (b'{"title": ', b'', b'NaN'):
+            with self.assertRaises(ParseError):
+                self._parse(body)
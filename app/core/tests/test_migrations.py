@@ -0,0 +1,65 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+BEFORE = [('core', '0008_normalized_name')]
+AFTER = [('core', '0009_merge_duplicate_names')]
+
+
+class MergeDuplicateNamesMigrationTests(TransactionTestCase):
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicate_tags_are_merged_with_their_recipe_links(self):
+        """Given"""
+        apps = self.migrate(BEFORE)
+        User = apps.get_model('core', 'User')
+        Tag = apps.get_model('core', 'Tag')
+        Recipe = apps.get_model('core', 'Recipe')
+        user = User.objects.create(email='test@test.com')
+        vegan = Tag.objects.create(user=user, name='Vegan')
+        duplicates = [
+            Tag.objects.create(user=user, name=' VEGAN '),
+            Tag.objects.create(user=user, name='vegan'),
+        ]
+        street = Tag.objects.create(user=user, name='Straße')
+        Tag.objects.create(user=user, name='STRASSE')
+        recipes = [
+            Recipe.objects.create(
+                user=user,
+                title=f'Recipe {i}',
+                time_minutes=5,
+                price='1.00'
+            )
+            for i in range(3)
+        ]
+        recipes[0].tags.add(vegan, duplicates[0])
+        recipes[1].tags.add(duplicates[0], duplicates[1])
+        recipes[2].tags.add(duplicates[1])
+
+        """When"""
+        apps = self.migrate(AFTER)
+
+        """Then"""
+        Tag = apps.get_model('core', 'Tag')
+        Recipe = apps.get_model('core', 'Recipe')
+        self.assertEqual(
+            list(Tag.objects.order_by('id').values_list(
+                'id', 'normalized_name'
+            )),
+            [(vegan.id, 'vegan'), (street.id, 'strasse')]
+        )
+        for recipe in Recipe.objects.all():
+            self.assertEqual(
+                list(recipe.tags.values_list('id', flat=True)),
+                [vegan.id]
+            )
@@ -1,3 +1,4 @@
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from core import models
@@ -53,6 +54,31 @@ class ModelTests(TestCase):
 
         self.assertEquals(str(tag), tag.name)
 
+    def test_tag_normalized_name_is_kept_in_step(self):
+        """Given"""
+        tag = models.Tag.objects.create(user=sample_user(), name='  Meat ')
+
+        """When"""
+        tag.name = 'STRAßE'
+        tag.save(update_fields=['name'])
+
+        """Then"""
+        tag.refresh_from_db()
+        self.assertEqual(tag.normalized_name, 'strasse')
+
+    def test_normalized_name_is_unique_per_user(self):
+        """Given"""
+        user = sample_user()
+        models.Ingredient.objects.create(user=user, name='Salt')
+        models.Ingredient.objects.create(
+            user=sample_user('other@lodonboyz.com'),
+            name='SALT'
+        )
+
+        """Then"""
+        with self.assertRaises(IntegrityError):
+            models.Ingredient.objects.create(user=user, name=' salt')
+
     def test_the_ingredient_string_rep(self):
         """Given"""
         ingredient = models.Ingredient.objects.create(
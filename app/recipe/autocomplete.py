@@ -0,0 +1,107 @@
+from bisect import bisect_left
+
+from django.db import connections
+from django.db.models import CharField, Func
+
+from core.cache import LRUCache
+from core.models import UserDataVersion, normalize_name
+
+# Index lookups within the TTL after which a user's names are cached
+HOT_USER_LOOKUPS = 3
+prefix_indexes = LRUCache(max_size=64, ttl=300)
+lookup_counts = LRUCache(max_size=4096, ttl=60)
+
+
+class CodepointCollate(Func):
+    """Compare a column by code point, as Python compares strings
+
+    PostgreSQL orders text by the database locale, where for example
+    accented letters sort next to their base letter, so its results
+    would not match the sorted PrefixIndex. Under "C", UTF-8 compares
+    byte by byte, which is code point order. SQLite already does this.
+    """
+    template = '%(expressions)s COLLATE "C"'
+    output_field = CharField()
+
+
+class PrefixIndex:
+    """A user's names sorted by normalized name, searched by bisection"""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows)
+        self.keys = [row[0] for row in self.rows]
+
+    @classmethod
+    def load(cls, model, user):
+        return cls(
+            model.objects.filter(user=user)
+            .values_list('normalized_name', 'id', 'name')
+        )
+
+    def search(self, prefix, limit):
+        """Return up to `limit` (normalized name, id, name) rows"""
+        start = bisect_left(self.keys, prefix)
+        matches = []
+        for row in self.rows[start:start + limit]:
+            if not row[0].startswith(prefix):
+                break
+            matches.append(row)
+
+        return matches
+
+
+def _query_prefix(model, user, prefix, limit):
+    """Range scan of the (user, normalized name) prefix index
+
+    Rows come back in the same order as PrefixIndex.search returns them.
+    """
+    queryset = model.objects.filter(user=user)
+    sort_field = 'normalized_name'
+    if connections[queryset.db].vendor == 'postgresql':
+        sort_field = 'sort_name'
+        queryset = queryset.annotate(
+            sort_name=CodepointCollate('normalized_name')
+        )
+
+    return list(
+        queryset.filter(**{f'{sort_field}__startswith': prefix})
+        .order_by(sort_field)
+        .values_list('normalized_name', 'id', 'name')[:limit]
+    )
+
+
+def _is_hot(model, user):
+    """Count an index lookup and return whether the user is now hot"""
+    key = (model._meta.label, user.id)
+    lookups = lookup_counts.get(key, 0) + 1
+    lookup_counts.set(key, lookups)
+
+    return lookups >= HOT_USER_LOOKUPS
+
+
+def autocomplete(model, user, prefix, limit):
+    """Return the id and name of the user's names starting with prefix
+
+    Names are matched on their normalized form. Users who look names up
+    repeatedly get their names cached in process as a sorted array,
+    which is dropped as soon as their data version changes.
+    """
+    prefix = normalize_name(prefix)
+    data_version = UserDataVersion.for_user(user)
+    key = (
+        model._meta.label,
+        user.id,
+        data_version.version,
+        data_version.updated_at,
+    )
+    index = prefix_indexes.get(key)
+    if index is None and _is_hot(model, user):
+        index = PrefixIndex.load(model, user)
+        prefix_indexes.set(key, index)
+
+    if index is None:
+        rows = _query_prefix(model, user, prefix, limit)
+    else:
+        rows = index.search(prefix, limit)
+
+    return [{'id': pk, 'name': name} for _, pk, name in rows]
@@ -0,0 +1,188 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from rest_framework.exceptions import ValidationError
+
+from core.models import Tag, Ingredient, Recipe, UserDataVersion, \
+                        normalize_name
+from core.search import refresh_search_documents
+
+BATCH_SIZE = 1000
+RELATED_FIELDS = (
+    ('ingredients', Ingredient),
+    ('tags', Tag),
+)
+
+
+def _missing_ids_error(ids):
+    return [f'Invalid pk "{pk}" - object does not exist.' for pk in ids]
+
+
+def _validate_batch(user, items):
+    """Check every referenced id for the whole batch with one query each
+
+    Returns the existing recipes being updated, keyed by id and locked
+    until the caller's transaction ends, in id order so overlapping
+    batches cannot deadlock. Raises a ValidationError holding one error
+    dict per item, in item order.
+    """
+    owned = {}
+    for field_name, model in RELATED_FIELDS:
+        ids = {pk for item in items for pk in item[field_name]}
+        owned[field_name] = set(
+            model.objects.filter(user=user, id__in=ids)
+            .values_list('id', flat=True)
+        )
+    recipe_ids = [item['id'] for item in items if 'id' in item]
+    existing = Recipe.objects.filter(user=user).select_for_update() \
+        .order_by('id').in_bulk(recipe_ids)
+
+    errors = []
+    seen = set()
+    for item in items:
+        item_errors = {}
+        if 'id' in item:
+            if item['id'] not in existing:
+                item_errors['id'] = _missing_ids_error([item['id']])
+            elif item['id'] in seen:
+                item_errors['id'] = ['Recipe appears more than once.']
+            seen.add(item['id'])
+        for field_name, _ in RELATED_FIELDS:
+            missing = [
+                pk for pk in item[field_name] if pk not in owned[field_name]
+            ]
+            if missing:
+                item_errors[field_name] = _missing_ids_error(missing)
+        errors.append(item_errors)
+
+    if any(errors):
+        raise ValidationError(errors)
+
+    return existing
+
+
+def _create_recipes(recipes):
+    """Insert recipes, setting their ids on the instances"""
+    if connection.features.can_return_ids_from_bulk_insert:
+        return Recipe.objects.bulk_create(recipes, batch_size=BATCH_SIZE)
+
+    for recipe in recipes:
+        recipe.save()
+
+    return recipes
+
+
+def bulk_save_recipes(user, items):
+    """Create or update a batch of recipes in a single transaction
+
+    Items with an id update that recipe, and their relations are
+    replaced. Items without an id are created. Link rows for every item
+    are written with one bulk insert per relation. Validation runs in
+    the same transaction, so recipes being updated cannot change or be
+    deleted between being checked and being written.
+    """
+    with transaction.atomic():
+        existing = _validate_batch(user, items)
+        recipes = []
+        created = []
+        for item in items:
+            fields = {
+                key: value for key, value in item.items()
+                if key not in ('id', 'ingredients', 'tags')
+            }
+            if 'id' in item:
+                recipe = existing[item['id']]
+                for key, value in fields.items():
+                    setattr(recipe, key, value)
+                recipe.save(update_fields=list(fields))
+            else:
+                recipe = Recipe(user=user, **fields)
+                created.append(recipe)
+            recipes.append(recipe)
+        _create_recipes(created)
+
+        for field_name, _ in RELATED_FIELDS:
+            field = Recipe._meta.get_field(field_name)
+            through = field.remote_field.through
+            recipe_column = field.m2m_field_name() + '_id'
+            related_column = field.m2m_reverse_field_name() + '_id'
+            if existing:
+                through.objects.filter(
+                    **{f'{recipe_column}__in': list(existing)}
+                ).delete()
+            through.objects.bulk_create(
+                (
+                    through(**{recipe_column: recipe.id, related_column: pk})
+                    for recipe, item in zip(recipes, items)
+                    for pk in dict.fromkeys(item[field_name])
+                ),
+                batch_size=BATCH_SIZE
+            )
+        # Bulk inserts send no signals, so refresh derived data here
+        refresh_search_documents([recipe.id for recipe in recipes])
+        UserDataVersion.bump(user.id)
+
+    return recipes
+
+
+def _ids_by_normalized_name(model, user, normalized_names):
+    return dict(
+        model.objects.filter(
+            user=user,
+            normalized_name__in=set(normalized_names)
+        ).values_list('normalized_name', 'id')
+    )
+
+
+def bulk_get_or_create_by_name(model, user, names):
+    """Return a name to id mapping, creating the names the user lacks
+
+    Names are matched on their normalized form. Existing rows are read
+    with one query and only missing names are inserted. Bulk callers for
+    the same user are serialized by locking the user row, but single
+    creates take no lock, so an insert that loses a race with one on the
+    unique normalized name is rolled back to a savepoint and the ids are
+    read again.
+    """
+    normalized = {name: normalize_name(name) for name in names}
+    with transaction.atomic():
+        get_user_model().objects.select_for_update().filter(
+            id=user.id
+        ).exists()
+        ids = _ids_by_normalized_name(model, user, normalized.values())
+        created = False
+        while True:
+            missing = {}
+            for name, normalized_name in normalized.items():
+                if normalized_name not in ids:
+                    missing.setdefault(normalized_name, name.strip())
+            if not missing:
+                break
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(
+                        (
+                            model(
+                                user=user,
+                                name=name,
+                                normalized_name=normalized_name
+                            )
+                            for normalized_name, name in missing.items()
+                        ),
+                        batch_size=BATCH_SIZE
+                    )
+                created = True
+            except IntegrityError:
+                # Each conflict is a row committed by a racing create, so
+                # every retry has fewer names left to insert
+                conflicts = _ids_by_normalized_name(
+                    model, user, normalized.values()
+                )
+                if not set(missing) & set(conflicts):
+                    raise
+                ids = conflicts
+                continue
+            ids = _ids_by_normalized_name(model, user, normalized.values())
+        if created:
+            UserDataVersion.bump(user.id)
+
+    return {name: ids[normalized[name]] for name in names}
@@ -0,0 +1,49 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from core.models import UserDataVersion
+
+
+class ConditionalGetMixin:
+    """Validate list responses against the user's data version
+
+    A matching If-None-Match is answered with 304 before the queryset is
+    built or anything is serialized. Viewsets with a detail route wrap
+    `retrieve` with `_conditional_response` too.
+
+    No Last-Modified is sent and If-Modified-Since is not honoured, as
+    HTTP dates have one second resolution and data can change several
+    times within a second.
+    """
+
+    def _get_etag(self, request, data_version):
+        """Tag the response by user, data version, URL and format"""
+        key = ':'.join((
+            str(data_version.user_id),
+            str(data_version.version),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ))
+
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def _conditional_response(self, handler, request, *args, **kwargs):
+        data_version = self.data_version = UserDataVersion.for_user(
+            request.user
+        )
+        etag = self._get_etag(request, data_version)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(
+            super().list, request, *args, **kwargs
+        )
@@ -0,0 +1,136 @@
+import logging
+
+from io import BytesIO
+
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from core.models import Recipe, UserDataVersion, recipe_image_file_path
+
+# Rendition field name mapped to the box the image is fitted into
+RENDITIONS = {
+    'image_thumbnail': (150, 150),
+    'image_medium': (800, 800),
+}
+JPEG_QUALITY = 85
+EXIF_ORIENTATION = 0x0112
+# EXIF orientation mapped to the transpose that turns the image upright
+ORIENTATION_TRANSPOSES = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def encode_jpeg(image):
+    """Re-encode an image as an optimized progressive JPEG
+
+    Only pixel data is written, so EXIF, ICC and other metadata of the
+    uploaded file is dropped.
+    """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format='JPEG',
+        quality=JPEG_QUALITY,
+        optimize=True,
+        progressive=True
+    )
+
+    return ContentFile(buffer.getvalue())
+
+
+def _save_jpeg(image):
+    """Store an encoded image under a fresh recipe upload path"""
+    path = recipe_image_file_path(None, 'image.jpg')
+
+    return default_storage.save(path, encode_jpeg(image))
+
+
+def stored_image_names(recipe):
+    """Return the storage names of a recipe image and its renditions"""
+    files = [recipe.image] + [
+        getattr(recipe, field_name) for field_name in RENDITIONS
+    ]
+
+    return [image_file.name for image_file in files if image_file]
+
+
+def exif_orientation(image):
+    """Return the EXIF orientation of a decoded image, if it has one"""
+    if hasattr(image, 'getexif'):
+        exif = image.getexif()
+    else:
+        # Pillow before 6.0 only reads EXIF from JPEG files
+        exif = getattr(image, '_getexif', lambda: None)() or {}
+
+    return exif.get(EXIF_ORIENTATION)
+
+
+def open_image(image_name):
+    """Decode a stored image, upright as its EXIF orientation says
+
+    Raises DecompressionBombError before decoding an image with more
+    pixels than Image.MAX_IMAGE_PIXELS, which Pillow only warns about.
+    """
+    with default_storage.open(image_name) as image_file:
+        image = Image.open(image_file)
+        pixels = image.width * image.height
+        if Image.MAX_IMAGE_PIXELS and pixels > Image.MAX_IMAGE_PIXELS:
+            raise Image.DecompressionBombError(
+                f'Image has {pixels} pixels, more than the limit of '
+                f'{Image.MAX_IMAGE_PIXELS}'
+            )
+        image.load()
+
+    method = ORIENTATION_TRANSPOSES.get(exif_orientation(image))
+    if method is None:
+        return image
+
+    return image.transpose(method)
+
+
+def process_recipe_image(recipe_id, image_name):
+    """Strip metadata from an uploaded image and build its renditions
+
+    The results are only written if the recipe still points at the image
+    that was processed, so a newer upload is never overwritten. An image
+    that cannot be decoded or encoded, for any reason, is marked failed.
+    """
+    recipe = Recipe.objects.filter(id=recipe_id, image=image_name)
+    user_id = recipe.values_list('user_id', flat=True).first()
+    if user_id is None:
+        return
+
+    fields = {}
+    try:
+        image = open_image(image_name)
+        fields['image'] = _save_jpeg(image)
+        for field_name, size in RENDITIONS.items():
+            rendition = image.copy()
+            rendition.thumbnail(size, Image.LANCZOS)
+            fields[field_name] = _save_jpeg(rendition)
+    except Exception:
+        logger.warning('Could not process image %s', image_name,
+                       exc_info=True)
+        for name in fields.values():
+            default_storage.delete(name)
+        if recipe.update(image_status=Recipe.IMAGE_FAILED):
+            UserDataVersion.bump(user_id)
+        return
+
+    if recipe.update(image_status=Recipe.IMAGE_READY, **fields):
+        UserDataVersion.bump(user_id)
+        default_storage.delete(image_name)
+    else:
+        for name in fields.values():
+            default_storage.delete(name)
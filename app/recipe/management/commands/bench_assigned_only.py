@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+
+from core.benchmark import BenchmarkCommand, seed_recipe_data, \
+                           viewset_queryset
+from core.models import Tag
+from recipe.views import TagViewSet
+
+
+class Command(BenchmarkCommand):
+    """Compare DISTINCT join and EXISTS plans for assigned_only tags"""
+    help = 'Benchmark the assigned_only tag filter strategies'
+    default_iterations = 20
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--links',
+            type=int,
+            default=100000,
+            help='Number of recipe to tag link rows to seed',
+        )
+
+    def run_benchmark(self, iterations, links, **options):
+        user = get_user_model().objects.create_user(
+            'bench-assigned-only@example.com',
+            'Password1'
+        )
+        seed_recipe_data(
+            user,
+            recipes=links // 3,
+            tags=500,
+            links_per_recipe=3
+        )
+
+        distinct_join = Tag.objects.filter(
+            user=user,
+            recipe__isnull=False
+        ).order_by('-name').distinct()
+        exists = viewset_queryset(TagViewSet, user, {'assigned_only': 1})
+
+        baseline = self.measure(
+            'JOIN + DISTINCT',
+            lambda: list(distinct_join.all()),
+            iterations
+        )
+        semi_join = self.measure(
+            'EXISTS semi-join',
+            lambda: list(exists.all()),
+            iterations
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Speedup: {baseline / semi_join:.1f}x'
+        ))
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.benchmark import BenchmarkCommand, seed_recipe_data
+from recipe import autocomplete
+from recipe.views import IngredientViewSet
+
+
+class Command(BenchmarkCommand):
+    """Time ingredient prefix lookups for a user with many ingredients"""
+    help = 'Benchmark the ingredient autocomplete endpoint'
+    default_iterations = 1000
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=10000,
+            help='Number of ingredients to seed for the user',
+        )
+
+    def run_benchmark(self, iterations, ingredients, **options):
+        user = get_user_model().objects.create_user(
+            'bench-autocomplete@example.com',
+            'Password1'
+        )
+        seed_recipe_data(user, recipes=0, ingredients=ingredients)
+        view = IngredientViewSet.as_view({'get': 'autocomplete'})
+        factory = APIRequestFactory()
+        prefixes = ['ingredient 1', 'ingredient 42', 'ingredient 9', 'nope']
+        calls = []
+
+        def lookup():
+            prefix = prefixes[len(calls) % len(prefixes)]
+            calls.append(prefix)
+            request = factory.get('/', {'prefix': prefix})
+            force_authenticate(request, user=user)
+            view(request)
+
+        autocomplete.prefix_indexes.clear()
+        autocomplete.lookup_counts.clear()
+        with patch.object(autocomplete, 'HOT_USER_LOOKUPS', float('inf')):
+            self.measure('Indexed query', lookup, iterations)
+        with patch.object(autocomplete, 'HOT_USER_LOOKUPS', 1):
+            self.measure('Cached sorted array', lookup, iterations)
@@ -0,0 +1,148 @@
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core.benchmark import seed_recipe_data
+
+MODES = (
+    ('WSGI, gthread workers', []),
+    ('ASGI, uvicorn workers', ['--asgi']),
+)
+
+
+async def run_client(port, request, requests, think_time, latencies, errors):
+    """Make requests over one keep-alive connection, pausing in between"""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    except OSError as exc:
+        errors.append(exc)
+        return
+
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            status_line, *header_lines = head.decode('latin1').split('\r\n')
+            headers = dict(
+                line.lower().split(': ', 1) for line in header_lines if line
+            )
+            await reader.readexactly(int(headers['content-length']))
+            latencies.append(time.perf_counter() - start)
+            if status_line.split(' ')[1] != '200':
+                errors.append(status_line)
+            await asyncio.sleep(think_time)
+    except (OSError, asyncio.IncompleteReadError, KeyError) as exc:
+        errors.append(exc)
+    finally:
+        writer.close()
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError('The server exited on startup')
+        try:
+            socket.create_connection(('127.0.0.1', port), 1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+
+    raise CommandError(f'The server did not listen on {port}')
+
+
+class Command(BaseCommand):
+    """Compare the WSGI and ASGI servers under many concurrent clients
+
+    Each client holds one keep-alive connection and lists recipes over
+    it, pausing between requests like a slow client would. Both servers
+    run the serve command with the same number of worker processes.
+    The data is committed so the servers can see it, and deleted after.
+    """
+    help = 'Benchmark concurrent keep-alive clients against WSGI and ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=500)
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=10,
+            help='Number of requests each client makes',
+        )
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            default=0.5,
+            help='Seconds each client waits between requests',
+        )
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Request threads in each WSGI worker',
+        )
+        parser.add_argument('--port', type=int, default=8089)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            'bench-concurrency@example.com',
+            'Password1'
+        )
+        token = Token.objects.create(user=user)
+        seed_recipe_data(user, recipes=100)
+        request = (
+            f'GET {reverse("recipe:recipe-list")} HTTP/1.1\r\n'
+            f'Host: localhost\r\n'
+            f'Authorization: Token {token.key}\r\n'
+            f'\r\n'
+        ).encode('latin1')
+        try:
+            for label, args in MODES:
+                self.run_mode(label, args, request, **options)
+        finally:
+            user.delete()
+
+    def run_mode(self, label, args, request, clients, requests, think_time,
+                 workers, threads, port, **options):
+        process = subprocess.Popen([
+            sys.executable, sys.argv[0], 'serve',
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers),
+            '--threads', str(threads),
+            *args
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port, process)
+            latencies, errors = [], []
+            start = time.perf_counter()
+            asyncio.get_event_loop().run_until_complete(asyncio.gather(*(
+                run_client(
+                    port, request, requests, think_time, latencies, errors
+                )
+                for _ in range(clients)
+            )))
+            elapsed = time.perf_counter() - start
+        finally:
+            process.terminate()
+            process.wait()
+
+        latencies.sort()
+        if not latencies:
+            raise CommandError(f'{label}: no requests completed')
+
+        p50_ms = latencies[len(latencies) // 2] * 1000
+        p99_ms = latencies[len(latencies) * 99 // 100] * 1000
+        self.stdout.write(
+            f'{label}: {len(latencies) / elapsed:.0f} requests/s, '
+            f'p50 {p50_ms:.1f} ms, p99 {p99_ms:.1f} ms, '
+            f'{len(errors)} errors'
+        )
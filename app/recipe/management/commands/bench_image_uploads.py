@@ -0,0 +1,119 @@
+import io
+import os
+import threading
+import tracemalloc
+
+from PIL import Image
+from django import forms
+from django.conf import settings
+from django.core.files.uploadhandler import load_handler
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.management.base import BaseCommand
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+from recipe.uploads import StreamingImageUploadHandler, read_image_header
+
+
+def default_handlers(request):
+    return [
+        load_handler(path, request) for path in settings.FILE_UPLOAD_HANDLERS
+    ]
+
+
+def streaming_handlers(request):
+    return [StreamingImageUploadHandler(request)]
+
+
+def validate_with_image_field(upload):
+    forms.ImageField().clean(upload)
+
+
+def noise_jpeg(size_kb):
+    """Encode random pixels, which JPEG cannot compress, to about size_kb"""
+    side = int((size_kb * 1024 / 1.5) ** 0.5)
+    image = Image.frombytes('RGB', (side, side), os.urandom(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=95)
+    buffer.name = 'upload.jpg'
+    buffer.seek(0)
+
+    return buffer
+
+
+def multipart_request(body):
+    """Build a request that reads the shared body without copying it"""
+    return WSGIRequest({
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'CONTENT_TYPE': MULTIPART_CONTENT,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.url_scheme': 'http',
+    })
+
+
+class Command(BaseCommand):
+    """Compare peak memory of concurrent uploads per upload handler"""
+    help = 'Benchmark memory used by concurrent recipe image uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uploads', type=int, default=16)
+        parser.add_argument('--size-kb', type=int, default=2048)
+
+    def handle(self, *args, **options):
+        body = encode_multipart(
+            BOUNDARY,
+            {'image': noise_jpeg(options['size_kb'])}
+        )
+        self.stdout.write(
+            f'{options["uploads"]} concurrent uploads of '
+            f'{len(body) // 1024} KB'
+        )
+
+        baseline = self.measure(
+            'Default handlers + ImageField',
+            body,
+            default_handlers,
+            validate_with_image_field,
+            options['uploads']
+        )
+        streaming = self.measure(
+            'Streaming handler + header check',
+            body,
+            streaming_handlers,
+            read_image_header,
+            options['uploads']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Peak memory reduced {baseline / streaming:.1f}x'
+        ))
+
+    def measure(self, label, body, handlers, validate, uploads):
+        """Parse and validate uploads in parallel and report peak memory"""
+        barrier = threading.Barrier(uploads)
+
+        def upload():
+            request = multipart_request(body)
+            request.upload_handlers = handlers(request)
+            barrier.wait()
+            image = request.FILES['image']
+            validate(image)
+            barrier.wait()
+            image.close()
+
+        threads = [threading.Thread(target=upload) for _ in range(uploads)]
+        tracemalloc.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        peak_mb = peak / (1024 * 1024)
+        self.stdout.write(f'{label}: {peak_mb:.1f} MB peak')
+
+        return peak_mb
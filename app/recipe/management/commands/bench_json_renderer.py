@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmark import BenchmarkCommand, seed_recipe_data
+from core.fast_json import FastJSONRenderer, get_fast_json
+from core.models import Recipe
+from recipe.serializers import RecipeDetailSerializer, RecipeValuesSerializer
+
+
+class Command(BenchmarkCommand):
+    """Compare the stdlib and fast JSON renderers on recipe payloads"""
+    help = 'Benchmark JSON rendering of recipe list and detail payloads'
+    default_iterations = 200
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Number of recipes in the list payload',
+        )
+
+    def run_benchmark(self, iterations, rows, **options):
+        if get_fast_json() is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson is not available, both renderers use the stdlib'
+            ))
+        user = get_user_model().objects.create_user(
+            'bench-json-renderer@example.com',
+            'Password1'
+        )
+        seed_recipe_data(user, recipes=rows, links_per_recipe=5)
+        queryset = Recipe.objects.filter(user=user).order_by('-id')
+        payloads = {
+            'list': RecipeValuesSerializer(
+                RecipeValuesSerializer.setup_eager_loading(queryset)
+            ).data,
+            'details': RecipeDetailSerializer(
+                RecipeDetailSerializer.setup_eager_loading(queryset[:100]),
+                many=True
+            ).data,
+        }
+
+        for label, payload in payloads.items():
+            baseline = self.measure(
+                f'JSONRenderer, {label}',
+                lambda: JSONRenderer().render(payload),
+                iterations
+            )
+            fast = self.measure(
+                f'FastJSONRenderer, {label}',
+                lambda: FastJSONRenderer().render(payload),
+                iterations
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Speedup for {label}: {baseline / fast:.1f}x'
+            ))
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+
+from core.benchmark import BenchmarkCommand, seed_recipe_data
+from core.models import Recipe
+from recipe.serializers import RecipeSerializer, RecipeValuesSerializer
+
+
+class Command(BenchmarkCommand):
+    """Compare ModelSerializer and values() rendering of recipe lists"""
+    help = 'Benchmark the fast recipe list serializer'
+    default_iterations = 5
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help='List sizes to render',
+        )
+
+    def run_benchmark(self, iterations, rows, **options):
+        user = get_user_model().objects.create_user(
+            'bench-list-serializer@example.com',
+            'Password1'
+        )
+        seed_recipe_data(user, recipes=max(rows))
+        queryset = Recipe.objects.filter(user=user).order_by('-id')
+        renderer = JSONRenderer()
+
+        for count in rows:
+            instances = RecipeSerializer.setup_eager_loading(queryset)
+            values = RecipeValuesSerializer.setup_eager_loading(queryset)
+            baseline = self.measure(
+                f'RecipeSerializer, {count} rows',
+                lambda: renderer.render(RecipeSerializer(
+                    instances.all()[:count],
+                    many=True
+                ).data),
+                iterations
+            )
+            fast = self.measure(
+                f'RecipeValuesSerializer, {count} rows',
+                lambda: renderer.render(RecipeValuesSerializer(
+                    values.all()[:count]
+                ).data),
+                iterations
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Speedup at {count} rows: {baseline / fast:.1f}x'
+            ))
@@ -0,0 +1,113 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.benchmark import seed_recipe_data, viewset_queryset
+from recipe import views
+from recipe.pagination import KeysetPagination
+
+INDEX_SCAN_MARKERS = (
+    'Index Scan',
+    'Index Only Scan',
+    'USING INDEX',
+    'USING COVERING INDEX',
+    'USING INTEGER PRIMARY KEY',
+)
+
+
+def is_full_scan(line):
+    """Check for a Postgres sequential scan or an unindexed SQLite scan"""
+    return 'Seq Scan' in line or (' SCAN ' in line and 'USING' not in line)
+
+
+def uses_index_scan(plan):
+    """Check that a query plan reads every table through an index"""
+    lines = plan.splitlines()
+
+    return (
+        any(marker in plan for marker in INDEX_SCAN_MARKERS) and
+        not any(is_full_scan(line) for line in lines)
+    )
+
+
+class Command(BaseCommand):
+    """EXPLAIN the list queries of each viewset against seeded data"""
+    help = 'Report whether the recipe API list queries use index scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=20000)
+        parser.add_argument('--users', type=int, default=20)
+
+    def get_cases(self, tag_ids, ingredient_ids):
+        tags = ','.join(str(tag_id) for tag_id in tag_ids[:3])
+        ingredients = ','.join(str(pk) for pk in ingredient_ids[:3])
+
+        return [
+            ('tags', views.TagViewSet, {}),
+            ('tags assigned_only', views.TagViewSet, {'assigned_only': 1}),
+            ('ingredients', views.IngredientViewSet, {}),
+            ('recipes', views.RecipeViewSet, {}),
+            ('recipes by tags', views.RecipeViewSet, {'tags': tags}),
+            (
+                'recipes by ingredients',
+                views.RecipeViewSet,
+                {'ingredients': ingredients}
+            ),
+            (
+                'recipes by price',
+                views.RecipeViewSet,
+                {'sort': 'price', 'min_price': '10.00', 'max_price': '50.00'}
+            ),
+            (
+                'recipes by time',
+                views.RecipeViewSet,
+                {'sort': '-time_minutes', 'max_time': 60}
+            ),
+            ('recipes by title', views.RecipeViewSet, {'sort': 'title'}),
+        ]
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.explain_all(
+                options['recipes'],
+                options['users'],
+                options['verbosity']
+            )
+            transaction.set_rollback(True)
+
+    def explain_all(self, recipes, users, verbosity):
+        """Seed a spread of users so the planner favours user indexes"""
+        for i in range(users):
+            user = get_user_model().objects.create_user(
+                f'explain-queries-{i}@example.com',
+                'Password1'
+            )
+            recipe_ids, tag_ids, ingredient_ids = seed_recipe_data(
+                user,
+                recipes=recipes // users,
+                seed=i
+            )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        all_indexed = True
+        for label, viewset_class, params in self.get_cases(
+            tag_ids,
+            ingredient_ids
+        ):
+            queryset = viewset_queryset(viewset_class, user, params)
+            plan = queryset[:KeysetPagination.page_size].explain()
+            indexed = uses_index_scan(plan)
+            all_indexed = all_indexed and indexed
+
+            style = self.style.SUCCESS if indexed else self.style.ERROR
+            verdict = 'index scan' if indexed else 'NO index scan'
+            self.stdout.write(style(f'{label}: {verdict}'))
+            if verbosity > 1:
+                self.stdout.write(plan)
+
+        if not all_indexed:
+            self.stdout.write(self.style.WARNING(
+                'Some list queries do not use an index scan'
+            ))
@@ -0,0 +1,158 @@
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination keyed on the ordering of the paginated view
+
+    The cursor holds the value of every ordering column of the row it
+    follows, and orderings always end with a unique id, so each page is
+    fetched with a row comparison such as
+    `WHERE (price > p) OR (price = p AND id > i)` and a `LIMIT`. No
+    `COUNT(*)` is run and no rows are skipped with `OFFSET`, however many
+    rows share a value.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        """Return the view's ordering, ending with the id tiebreak"""
+        if hasattr(view, 'get_ordering'):
+            ordering = view.get_ordering()
+        else:
+            ordering = getattr(view, 'ordering', self.ordering)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        ordering = tuple(ordering)
+        if not {'id', 'pk'} & {name.lstrip('-') for name in ordering}:
+            direction = '-' if ordering[0].startswith('-') else ''
+            ordering += (f'{direction}id',)
+
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        if reverse:
+            queryset = queryset.order_by(*(
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in self.ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(
+                    self.following(self.cursor.position, reverse)
+                )
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        if self.has_previous or self.has_next:
+            self.display_page_controls = True
+
+        return self.page
+
+    def following(self, position, reverse):
+        """Match the rows after `position` in the page order
+
+        Built as a lexicographic comparison, one branch per ordering
+        column, so ties on leading columns fall through to the next.
+        """
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, position):
+            attr = name.lstrip('-')
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**equal, **{f'{attr}__{lookup}': value})
+            equal[attr] = value
+
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(Cursor(
+            offset=0,
+            reverse=False,
+            position=self._get_position_from_instance(
+                self.page[-1], self.ordering
+            )
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.encode_cursor(Cursor(
+            offset=0,
+            reverse=True,
+            position=self._get_position_from_instance(
+                self.page[0], self.ordering
+            )
+        ))
+
+    def decode_cursor(self, request):
+        """Return the cursor in the request, or None for the first page"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            position = tokens['p']
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {'p': cursor.position}
+        if cursor.reverse:
+            tokens['r'] = '1'
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [name.lstrip('-') for name in ordering]
+        if isinstance(instance, dict):
+            return [str(instance[name]) for name in names]
+
+        return [str(getattr(instance, name)) for name in names]
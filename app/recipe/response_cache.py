@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.cache import LRUCache
+from core.models import UserDataVersion
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE_CACHE = {
+    'LOCAL_MAX_SIZE': 1024,
+    'LOCAL_MAX_BYTES': 64 * 1024 * 1024,
+    'TTL': 300,
+    'SHARED_CACHE': None,
+    'STATS_LOG_INTERVAL': 1000,
+}
+
+
+def entry_size(entry):
+    """Size of a cached response entry, counting its content only"""
+    return len(entry[2])
+
+
+class ResponseCache:
+    """Cache of rendered responses in local memory or a shared cache
+
+    Entries are stored under keys that include the owner's data version,
+    so a write by one user makes only that user's entries unreachable,
+    in every process sharing the cache. Unreachable entries are dropped
+    by LRU eviction or their TTL. The local tier is bounded by content
+    bytes as well as by entries.
+
+    The hit and miss counters of the process are logged every
+    `stats_log_interval` lookups.
+    """
+
+    def __init__(self, local_max_size, ttl, shared_cache=None,
+                 local_max_bytes=None, stats_log_interval=None):
+        self.local = LRUCache(
+            max_size=local_max_size,
+            ttl=ttl,
+            max_bytes=local_max_bytes,
+            sizeof=entry_size
+        )
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+        self.stats_log_interval = stats_log_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        """Build the cache from the RECIPE_RESPONSE_CACHE setting"""
+        options = dict(DEFAULT_RESPONSE_CACHE)
+        options.update(getattr(settings, 'RECIPE_RESPONSE_CACHE', {}))
+
+        return cls(
+            local_max_size=options['LOCAL_MAX_SIZE'],
+            ttl=options['TTL'],
+            shared_cache=options['SHARED_CACHE'],
+            local_max_bytes=options['LOCAL_MAX_BYTES'],
+            stats_log_interval=options['STATS_LOG_INTERVAL'],
+        )
+
+    @property
+    def backend(self):
+        if self.shared_cache is None:
+            return self.local
+
+        return caches[self.shared_cache]
+
+    def get(self, key):
+        """Return a cached (status, content type, content) entry or None"""
+        entry = self.backend.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            stats = self.stats()
+        lookups = stats['hits'] + stats['misses']
+        if self.stats_log_interval and \
+                lookups % self.stats_log_interval == 0:
+            logger.info(
+                'Response cache: %(hits)d hits, %(misses)d misses',
+                stats
+            )
+
+        return entry
+
+    def set(self, key, entry):
+        self.backend.set(key, entry, self.ttl)
+
+    def stats(self):
+        """Return the hit and miss counters of this process"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        """Empty the local tier and reset the counters"""
+        self.local.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+response_cache = ResponseCache.from_settings()
+
+
+class CachedListMixin:
+    """Serve repeated list calls of a user from the response cache
+
+    Query parameters are normalized before keying, so reordered
+    parameters or id lists share an entry. Listed parameters are treated
+    as comma separated sets.
+    """
+    cache_set_params = ()
+
+    def _normalize_query(self, request):
+        params = []
+        for name in sorted(request.query_params):
+            values = request.query_params.getlist(name)
+            if name in self.cache_set_params:
+                values = [','.join(sorted({
+                    value for param in values for value in param.split(',')
+                }))]
+            params.extend((name, value) for value in sorted(values))
+
+        return params
+
+    def _get_cache_key(self, request):
+        # The data version may already have been read for a conditional GET
+        data_version = getattr(self, 'data_version', None)
+        if data_version is None:
+            data_version = UserDataVersion.for_user(request.user)
+        key = repr((
+            self._normalize_query(request),
+            request.META.get('HTTP_ACCEPT', ''),
+        ))
+
+        return ':'.join((
+            'recipe-response',
+            str(request.user.id),
+            str(data_version.version),
+            str(data_version.updated_at.timestamp()),
+            f'{self.basename}.{self.action}',
+            hashlib.sha256(key.encode()).hexdigest(),
+        ))
+
+    def list(self, request, *args, **kwargs):
+        self.cache_key = self._get_cache_key(request)
+        entry = response_cache.get(self.cache_key)
+        if entry is not None:
+            status_code, content_type, content = entry
+            return HttpResponse(
+                content,
+                content_type=content_type,
+                status=status_code
+            )
+
+        return super().list(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        cache_key = getattr(self, 'cache_key', None)
+        # Responses served from the cache are plain HttpResponses
+        if cache_key and isinstance(response, Response) and \
+                response.status_code == status.HTTP_200_OK:
+            response.render()
+            response_cache.set(cache_key, (
+                response.status_code,
+                response['Content-Type'],
+                response.content,
+            ))
+
+        return response
@@ -1,9 +1,32 @@
+from collections import defaultdict
+
+from django.db.models import Prefetch
 from rest_framework import serializers
 
-from core.models import Tag, Ingredient, Recipe
+from core.models import Tag, Ingredient, Recipe, normalize_name
+from recipe.uploads import read_image_header
+
+DUPLICATE_NAME_ERROR = 'An item with this name already exists.'
+
+
+class RecipeAttributeSerializer(serializers.ModelSerializer):
+    """Base serializer for the user owned, uniquely named attributes"""
 
+    def validate_name(self, value):
+        """Reject a name the user already has once both are normalized"""
+        duplicates = self.Meta.model.objects.filter(
+            user=self.context['request'].user,
+            normalized_name=normalize_name(value)
+        )
+        if self.instance is not None:
+            duplicates = duplicates.exclude(id=self.instance.id)
+        if duplicates.exists():
+            raise serializers.ValidationError(DUPLICATE_NAME_ERROR)
 
-class TagSerializer(serializers.ModelSerializer):
+        return value
+
+
+class TagSerializer(RecipeAttributeSerializer):
 
     class Meta:
         model = Tag
@@ -11,7 +34,7 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(RecipeAttributeSerializer):
     """Serializer for an ingredient object"""
 
     class Meta:
@@ -20,7 +43,48 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class NameListSerializer(serializers.Serializer):
+    """Serializer for a batch of tag or ingredient names"""
+    names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=10000
+    )
+
+
+class AutocompleteSerializer(serializers.Serializer):
+    """Validate a name prefix lookup"""
+    prefix = serializers.CharField(max_length=255)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+RECIPE_RELATED_FIELDS = ('ingredients', 'tags')
+
+
+def load_only(queryset, fields):
+    """Load the rendered columns, plus those ordering and signals need"""
+    ordering = {
+        name.lstrip('-') for name in queryset.query.order_by
+        if name.lstrip('-') not in queryset.query.annotations
+    }
+    columns = {
+        name for name in fields if name not in RECIPE_RELATED_FIELDS
+    }
+
+    return queryset.only('id', 'user', *columns, *ordering)
+
+
+class SparseFieldsMixin:
+    """Render only the declared fields named by a `fields` argument"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for an recipe object"""
     ingredients = serializers.PrimaryKeyRelatedField(
         many=True,
@@ -37,17 +101,183 @@ class RecipeSerializer(serializers.ModelSerializer):
                   'link', 'ingredients', 'tags')
         read_only_fields = ('id',)
 
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """Load the rendered columns and prefetch the rendered related ids"""
+        fields = cls.Meta.fields if fields is None else fields
+        prefetches = [
+            Prefetch(
+                name,
+                queryset=model.objects.only('id').order_by('id')
+            )
+            for name, model in (('ingredients', Ingredient), ('tags', Tag))
+            if name in fields
+        ]
+
+        return load_only(queryset, fields).prefetch_related(*prefetches)
+
+
+class RecipeValuesSerializer:
+    """Read only fast path rendering recipe lists like RecipeSerializer
+
+    Rows are plain values() dicts and related ids are read with one query
+    per relation, grouped in a single pass. Only fields whose value needs
+    converting, like the price, go through their serializer field.
+    """
+    fields = RecipeSerializer.Meta.fields
+    related_fields = RECIPE_RELATED_FIELDS
+    _converters = None
+
+    def __init__(self, instance=None, many=True, fields=None, **kwargs):
+        self.instance = instance
+        if fields is not None:
+            self.fields = tuple(name for name in self.fields if name in fields)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """Select the rendered columns, plus those used for paging"""
+        fields = cls.fields if fields is None else fields
+        ordering = [
+            name.lstrip('-') for name in queryset.query.order_by
+            if name.lstrip('-') not in queryset.query.annotations
+        ]
+        value_fields = {
+            name for name in fields if name not in cls.related_fields
+        }
+
+        return queryset.values(
+            'id', *value_fields, *ordering, *queryset.query.annotations
+        )
+
+    @classmethod
+    def get_converters(cls):
+        """Return to_representation of the fields that change values"""
+        if cls._converters is None:
+            fields = RecipeSerializer().fields
+            cls._converters = {
+                name: fields[name].to_representation
+                for name in cls.fields
+                if name not in cls.related_fields and
+                type(fields[name]) not in (
+                    serializers.CharField,
+                    serializers.IntegerField,
+                )
+            }
+
+        return cls._converters
+
+    def get_related_ids(self, recipe_ids, field_names):
+        """Return each relation's linked ids per recipe, in id order"""
+        related_ids = {}
+        for field_name in field_names:
+            field = Recipe._meta.get_field(field_name)
+            recipe_column = field.m2m_field_name()
+            related_column = field.m2m_reverse_field_name()
+            links = field.remote_field.through.objects.filter(
+                **{f'{recipe_column}__in': recipe_ids}
+            ).order_by(related_column).values_list(
+                recipe_column, related_column
+            )
+            grouped = related_ids[field_name] = defaultdict(list)
+            for recipe_id, pk in links:
+                grouped[recipe_id].append(pk)
+
+        return related_ids
+
+    @property
+    def data(self):
+        rows = list(self.instance)
+        if not rows:
+            return []
+
+        converters = self.get_converters()
+        related_ids = self.get_related_ids(
+            [row['id'] for row in rows],
+            [name for name in self.related_fields if name in self.fields]
+        )
+        data = []
+        for row in rows:
+            item = {}
+            for name in self.fields:
+                if name in related_ids:
+                    item[name] = related_ids[name].get(row['id'], [])
+                elif name in converters and row[name] is not None:
+                    item[name] = converters[name](row[name])
+                else:
+                    item[name] = row[name]
+            data.append(item)
+
+        return data
+
+
+class RecipeBulkSerializer(serializers.ModelSerializer):
+    """Serializer for one item of a bulk recipe write
+
+    Related ids are plain integers here; they are checked for the whole
+    batch at once instead of with a query per id.
+    """
+    id = serializers.IntegerField(required=False)
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(),
+        default=list
+    )
+    tags = serializers.ListField(
+        child=serializers.IntegerField(),
+        default=list
+    )
+
+    class Meta:
+        model = Recipe
+        fields = RecipeSerializer.Meta.fields
+
 
 class RecipeDetailSerializer(RecipeSerializer):
     """Serialize a single recipes details"""
     ingredients = IngredientSerializer(many=True, read_only=True)
     tags = TagSerializer(many=True, read_only=True)
 
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """Load the rendered columns and prefetch the nested objects"""
+        fields = cls.Meta.fields if fields is None else fields
+
+        return load_only(queryset, fields).prefetch_related(*[
+            name for name in RECIPE_RELATED_FIELDS if name in fields
+        ])
+
+
+class ImageHeaderField(serializers.FileField):
+    """File field that validates images from their header alone
+
+    Unlike ImageField it never reads the whole upload into memory to
+    verify it; decoding is left to the background image processing.
+    """
+    default_error_messages = {
+        'invalid_image': 'Upload a valid JPEG, PNG, GIF or WebP image.',
+    }
+
+    def to_internal_value(self, data):
+        file_object = super().to_internal_value(data)
+        try:
+            read_image_header(file_object)
+        except ValueError:
+            self.fail('invalid_image')
+
+        return file_object
+
 
 class RecipeImageSerializer(serializers.ModelSerializer):
     """Serializer for uploading recipe images"""
+    image = ImageHeaderField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'image')
-        read_only_fields = ('id',)
+        fields = ('id', 'image', 'image_status',
+                  'image_thumbnail', 'image_medium')
+        read_only_fields = ('id', 'image_status',
+                            'image_thumbnail', 'image_medium')
+
+    @staticmethod
+    def setup_eager_loading(queryset, fields=None):
+        """The image serializer renders no relations"""
+        return queryset
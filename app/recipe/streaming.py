@@ -0,0 +1,46 @@
+from core.fast_json import FastJSONRenderer
+
+
+def iterate_in_chunks(queryset, chunk_size):
+    """Yield lists of rows ordered by descending id, one query per list
+
+    Each chunk is a keyset query (`id < last seen id`), so prefetches run
+    per chunk and only one chunk of rows is held in memory at a time.
+    """
+    queryset = queryset.order_by('-id')
+    last_id = None
+    while True:
+        chunk = queryset
+        if last_id is not None:
+            chunk = chunk.filter(id__lt=last_id)
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            return
+
+        yield rows
+
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1].id
+
+
+def stream_json_array(queryset, serializer_class, chunk_size, context=None,
+                      fields=None):
+    """Serialize a queryset chunk by chunk into the pieces of a JSON array
+
+    Each chunk is encoded as one array, whose brackets are dropped so the
+    chunks join into a single array. Only `fields` are rendered if given.
+    """
+    renderer = FastJSONRenderer()
+    yield b'['
+    separator = b''
+    for rows in iterate_in_chunks(queryset, chunk_size):
+        serializer = serializer_class(
+            rows,
+            many=True,
+            context=context,
+            fields=fields
+        )
+        yield separator + renderer.render(serializer.data)[1:-1]
+        separator = b','
+    yield b']'
@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from recipe.management.commands.explain_queries import uses_index_scan
+
+
+class ExplainQueriesCommandTests(TestCase):
+
+    def test_every_list_query_uses_an_index(self):
+        """Given"""
+        out = StringIO()
+
+        """When"""
+        call_command('explain_queries', recipes=40, users=2, stdout=out)
+
+        """Then"""
+        output = out.getvalue()
+        self.assertIn('recipes by tags: index scan', output)
+        self.assertNotIn('NO index scan', output)
+
+    def test_sequential_scan_is_reported(self):
+        """Given"""
+        postgres_plan = (
+            'Limit  (cost=0.00..4.10 rows=100 width=20)\n'
+            '  ->  Seq Scan on core_tag  (cost=0.00..41.00 rows=1000)'
+        )
+        sqlite_plan = '2 0 0 SCAN core_tag'
+
+        """Then"""
+        self.assertFalse(uses_index_scan(postgres_plan))
+        self.assertFalse(uses_index_scan(sqlite_plan))
+        self.assertTrue(uses_index_scan(
+            '5 0 0 SEARCH core_tag '
+            'USING INDEX tag_user_name_id_idx (user_id=?)'
+        ))
@@ -0,0 +1,187 @@
+import time
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient, UserDataVersion
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+INGREDIENTS_URL = reverse("recipe:ingredient-list")
+
+
+def create_recipe_details_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Curry',
+            time_minutes=30,
+            price=6.00
+        )
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user,
+            name='Tofu'
+        )
+
+    def _etag(self, url):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return res['ETag']
+
+    def _assert_changes_etag(self, url, change):
+        etag = self._etag(url)
+        change()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_list_and_detail_send_validators(self):
+        for url in (
+            RECIPES_URL,
+            TAGS_URL,
+            INGREDIENTS_URL,
+            create_recipe_details_url(self.recipe.id),
+        ):
+            """When"""
+            res = self.client.get(url)
+
+            """Then"""
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertIn('ETag', res)
+            self.assertNotIn('Last-Modified', res)
+
+    def test_matching_etag_returns_not_modified_without_listing(self):
+        """Given"""
+        etag = self._etag(RECIPES_URL)
+
+        """When"""
+        """Only the data version is read"""
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertFalse(res.content)
+
+    def test_if_modified_since_is_ignored(self):
+        """Given"""
+        self.client.get(TAGS_URL)
+        Tag.objects.create(user=self.user, name='Spicy')
+
+        """When"""
+        res = self.client.get(
+            TAGS_URL,
+            HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_etag_differs_per_user(self):
+        """Given"""
+        other_user = get_user_model().objects.create_user(
+            'other@test.com',
+            'Password1'
+        )
+        etag = self._etag(TAGS_URL)
+        UserDataVersion.objects.update_or_create(
+            user=other_user,
+            defaults={
+                'version': UserDataVersion.for_user(self.user).version,
+            }
+        )
+
+        """When"""
+        self.client.force_authenticate(user=other_user)
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_etag_differs_per_query(self):
+        """When"""
+        etag = self._etag(RECIPES_URL)
+        res = self.client.get(
+            RECIPES_URL,
+            {'tags': self.tag.id},
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_recipe_changes_invalidate(self):
+        def create():
+            Recipe.objects.create(
+                user=self.user,
+                title='Stew',
+                time_minutes=60,
+                price=4.00
+            )
+
+        def update():
+            self.recipe.title = 'Green curry'
+            self.recipe.save()
+
+        for change in (create, update, self.recipe.delete):
+            self._assert_changes_etag(RECIPES_URL, change)
+
+    def test_tag_and_ingredient_changes_invalidate(self):
+        def update_tag():
+            self.tag.name = 'Vegetarian'
+            self.tag.save()
+
+        self._assert_changes_etag(TAGS_URL, update_tag)
+        self._assert_changes_etag(TAGS_URL, self.tag.delete)
+        self._assert_changes_etag(INGREDIENTS_URL, self.ingredient.delete)
+
+    def test_link_changes_invalidate(self):
+        url = create_recipe_details_url(self.recipe.id)
+
+        self._assert_changes_etag(
+            url,
+            lambda: self.recipe.tags.add(self.tag)
+        )
+        self._assert_changes_etag(
+            url,
+            lambda: self.recipe.tags.remove(self.tag)
+        )
+        self._assert_changes_etag(
+            url,
+            lambda: self.ingredient.recipe_set.add(self.recipe)
+        )
+
+    def test_other_users_changes_do_not_invalidate(self):
+        """Given"""
+        other_user = get_user_model().objects.create_user(
+            'other@test.com',
+            'Password1'
+        )
+        etag = self._etag(TAGS_URL)
+
+        """When"""
+        Tag.objects.create(user=other_user, name='Private')
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
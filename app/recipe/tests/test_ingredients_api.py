@@ -7,9 +7,12 @@ from rest_framework import status
 
 from core.models import Ingredient, Recipe
 
+from recipe import autocomplete
 from recipe.serializers import IngredientSerializer
 
 INGREDIENTS_URL = reverse("recipe:ingredient-list")
+INGREDIENTS_BULK_URL = reverse("recipe:ingredient-bulk")
+INGREDIENTS_AUTOCOMPLETE_URL = reverse("recipe:ingredient-autocomplete")
 
 
 class PublicIngredientsApiTest(TestCase):
@@ -47,7 +50,7 @@ class PrivateTagsApiTests(TestCase):
         ingredients = Ingredient.objects.all().order_by('-name')
         serializer = IngredientSerializer(ingredients, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_should_only_have_ingredients_for_authenticated_user(self):
         """Given"""
@@ -63,8 +66,8 @@ class PrivateTagsApiTests(TestCase):
 
         """Then"""
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], ingredient.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], ingredient.name)
 
     def test_create_ingredient_successful(self):
         """Given"""
@@ -112,8 +115,8 @@ class PrivateTagsApiTests(TestCase):
         """Then"""
         serializer1 = IngredientSerializer(ingredient1)
         serializer2 = IngredientSerializer(ingredient2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertNotIn(serializer2.data, res.data['results'])
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
     def test_retrieved_ingredients_assigned_unique(self):
@@ -139,4 +142,104 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
 
         """Then"""
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_bulk_get_or_create_ingredients_by_name(self):
+        """Given"""
+        existing = Ingredient.objects.create(user=self.user, name="Salt")
+        payload = {'names': ['Salt', 'Pepper']}
+
+        """When"""
+        res = self.client.post(INGREDIENTS_BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['Salt'], existing.id)
+        pepper = Ingredient.objects.get(user=self.user, name='Pepper')
+        self.assertEqual(res.data['Pepper'], pepper.id)
+
+
+class IngredientAutocompleteTests(TestCase):
+
+    def setUp(self):
+        autocomplete.prefix_indexes.clear()
+        autocomplete.lookup_counts.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        for name in ('Salt', 'Salmon', 'Sage', 'Pepper'):
+            Ingredient.objects.create(user=self.user, name=name)
+
+    def _names(self, params):
+        res = self.client.get(INGREDIENTS_AUTOCOMPLETE_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [ingredient['name'] for ingredient in res.data]
+
+    def test_names_are_matched_on_normalized_prefix(self):
+        """Given"""
+        other_user = get_user_model().objects.create_user(
+            'other@test.com',
+            'Password1'
+        )
+        Ingredient.objects.create(user=other_user, name='Saffron')
+
+        """Then"""
+        self.assertEqual(self._names({'prefix': ' SAL'}), ['Salmon', 'Salt'])
+        self.assertEqual(self._names({'prefix': 'x'}), [])
+
+    def test_results_are_limited(self):
+        self.assertEqual(
+            self._names({'prefix': 's', 'limit': 2}),
+            ['Sage', 'Salmon']
+        )
+
+    def test_hot_users_are_served_from_memory(self):
+        """Given"""
+        for _ in range(autocomplete.HOT_USER_LOOKUPS):
+            self._names({'prefix': 'sa'})
+
+        """When"""
+        """Only the data version is read"""
+        with self.assertNumQueries(1):
+            names = self._names({'prefix': 'sal'})
+
+        """Then"""
+        self.assertEqual(names, ['Salmon', 'Salt'])
+
+    def test_cached_names_are_dropped_on_change(self):
+        """Given"""
+        for _ in range(autocomplete.HOT_USER_LOOKUPS):
+            self._names({'prefix': 'sa'})
+
+        """When"""
+        Ingredient.objects.create(user=self.user, name='Salsa')
+
+        """Then"""
+        self.assertEqual(
+            self._names({'prefix': 'sal'}),
+            ['Salmon', 'Salsa', 'Salt']
+        )
+
+    def test_memory_and_database_lookups_agree_on_order(self):
+        """Given"""
+        for name in ('Sémola', 'Sz', 'S-mix', 'Sa2', 'SA10', 'S mix'):
+            Ingredient.objects.create(user=self.user, name=name)
+        index = autocomplete.PrefixIndex.load(Ingredient, self.user)
+
+        """When"""
+        queried = autocomplete._query_prefix(Ingredient, self.user, 's', 50)
+
+        """Then"""
+        self.assertEqual(queried, index.search('s', 50))
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({}, {'prefix': 'sa', 'limit': 0}):
+            """When"""
+            res = self.client.get(INGREDIENTS_AUTOCOMPLETE_URL, params)
+
+            """Then"""
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
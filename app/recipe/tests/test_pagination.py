@@ -0,0 +1,187 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+
+
+def sample_recipe(user, **params):
+    defaults = {
+        'title': 'Default Recipe',
+        'time_minutes': 10,
+        'price': 5.00
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _collect_pages(self, url, params):
+        """Follow the next links and return every page's results"""
+        pages = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append(res.data['results'])
+            if not res.data['next']:
+                return pages
+            res = self.client.get(res.data['next'])
+
+    def test_recipes_paginated_by_descending_id(self):
+        """Given"""
+        recipes = [
+            sample_recipe(user=self.user, title=f'Recipe {i}')
+            for i in range(5)
+        ]
+
+        """When"""
+        pages = self._collect_pages(RECIPES_URL, {'page_size': 2})
+
+        """Then"""
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        ids = [recipe['id'] for page in pages for recipe in page]
+        self.assertEqual(ids, [recipe.id for recipe in reversed(recipes)])
+
+    def test_tags_paginated_by_descending_name(self):
+        """Given"""
+        for name in ('Apple', 'Banana', 'Cherry'):
+            Tag.objects.create(user=self.user, name=name)
+
+        """When"""
+        pages = self._collect_pages(TAGS_URL, {'page_size': 2})
+
+        """Then"""
+        names = [tag['name'] for page in pages for tag in page]
+        self.assertEqual(names, ['Cherry', 'Banana', 'Apple'])
+
+    def test_filters_apply_across_pages(self):
+        """Given"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        tagged = []
+        for i in range(3):
+            recipe = sample_recipe(user=self.user, title=f'Tagged {i}')
+            recipe.tags.add(tag)
+            tagged.append(recipe.id)
+            sample_recipe(user=self.user, title=f'Untagged {i}')
+
+        """When"""
+        pages = self._collect_pages(
+            RECIPES_URL,
+            {'tags': str(tag.id), 'page_size': 2}
+        )
+
+        """Then"""
+        ids = [recipe['id'] for page in pages for recipe in page]
+        self.assertEqual(sorted(ids), tagged)
+
+    def test_pages_do_not_count_or_offset(self):
+        """Given"""
+        for i in range(5):
+            sample_recipe(user=self.user, title=f'Recipe {i}')
+        first = self.client.get(RECIPES_URL, {'page_size': 2})
+
+        """When"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(first.data['next'])
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'].upper())
+            self.assertNotIn('OFFSET', query['sql'].upper())
+
+    def test_more_tied_rows_than_the_offset_cutoff_are_all_paged(self):
+        """Given"""
+        Recipe.objects.bulk_create(
+            Recipe(user=self.user, title=f'Recipe {i}', time_minutes=30,
+                   price=5)
+            for i in range(1300)
+        )
+
+        """When"""
+        pages = self._collect_pages(
+            RECIPES_URL,
+            {'sort': 'time_minutes', 'page_size': 100}
+        )
+
+        """Then"""
+        ids = [recipe['id'] for page in pages for recipe in page]
+        self.assertEqual(len(pages), 13)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 1300)
+
+    def test_tied_pages_filter_on_the_tiebreak_without_offset(self):
+        """Given"""
+        for i in range(7):
+            sample_recipe(user=self.user, title=f'Recipe {i}', price=4)
+        params = {'sort': '-price', 'page_size': 2}
+        res = self.client.get(RECIPES_URL, params)
+        for _ in range(2):
+            res = self.client.get(res.data['next'])
+
+        """When"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(res.data['next'])
+
+        """Then"""
+        self.assertEqual(len(res.data['results']), 1)
+        for query in queries.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'].upper())
+
+    def test_previous_link_returns_the_preceding_page(self):
+        """Given"""
+        for i in range(5):
+            sample_recipe(user=self.user, title=f'Recipe {i}', price=4)
+        params = {'sort': 'price', 'page_size': 2}
+        first = self.client.get(RECIPES_URL, params)
+        second = self.client.get(first.data['next'])
+
+        """When"""
+        res = self.client.get(second.data['previous'])
+
+        """Then"""
+        self.assertEqual(res.data['results'], first.data['results'])
+        self.assertIsNotNone(res.data['next'])
+
+    def test_malformed_cursor_is_not_found(self):
+        """Given"""
+        params = {'sort': 'price', 'cursor': 'cD1mcmVlJnA9MQ=='}
+
+        """When"""
+        res = self.client.get(RECIPES_URL, params)
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tag_pages_are_keyed_on_name_and_id(self):
+        """Given"""
+        for name in ('Apple', 'Banana', 'Cherry'):
+            Tag.objects.create(user=self.user, name=name)
+        first = self.client.get(TAGS_URL, {'page_size': 1})
+
+        """When"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(first.data['next'])
+
+        """Then"""
+        self.assertEqual(res.data['results'][0]['name'], 'Banana')
+        for query in queries.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'].upper())
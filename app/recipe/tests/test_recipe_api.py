@@ -1,9 +1,12 @@
+import json
 import tempfile
 import os
 
 from PIL import Image
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -15,6 +18,7 @@ from core.models import Recipe, Tag, Ingredient
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
 RECIPES_URL = reverse("recipe:recipe-list")
+EXPORT_URL = reverse("recipe:recipe-export")
 
 
 def image_upload_url(recipe_id):
@@ -84,7 +88,7 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_should_have_recipe_for_authenticated_user(self):
         """Given"""
@@ -102,8 +106,8 @@ class PrivateRecipeApiTests(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_should_view_a_recipe_details(self):
         """Given"""
@@ -255,7 +259,7 @@ class RecipeImageUploadTest(TestCase):
 
             """Then"""
             self.recipe.refresh_from_db()
-            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
             self.assertIn('image', res.data)
             self.assertTrue(os.path.exists(self.recipe.image.path))
 
@@ -289,9 +293,9 @@ class RecipeImageUploadTest(TestCase):
         serializer1 = RecipeSerializer(recipe1)
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
     def test_filter_recipes_by_ingredients(self):
@@ -314,7 +318,256 @@ class RecipeImageUploadTest(TestCase):
         serializer1 = RecipeSerializer(recipe1)
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertIn(serializer2.data, res.data['results'])
+        self.assertNotIn(serializer3.data, res.data['results'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class RecipeFilterMatchTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tag1 = sample_tag(user=self.user, name='Vegan')
+        self.tag2 = sample_tag(user=self.user, name='Quick')
+        self.both = sample_recipe(user=self.user, title='Vegan stir fry')
+        self.both.tags.add(self.tag1, self.tag2)
+        self.one = sample_recipe(user=self.user, title='Vegan stew')
+        self.one.tags.add(self.tag1)
+
+    def _ids(self, res):
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_match_any_returns_each_recipe_once(self):
+        """When"""
+        res = self.client.get(
+            RECIPES_URL,
+            {'tags': f'{self.tag1.id},{self.tag2.id}'}
+        )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(res), [self.one.id, self.both.id])
+
+    def test_match_all_requires_every_tag(self):
+        """When"""
+        res = self.client.get(
+            RECIPES_URL,
+            {'tags': f'{self.tag1.id},{self.tag2.id}', 'match': 'all'}
+        )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(res), [self.both.id])
+
+    def test_match_all_combines_tags_and_ingredients(self):
+        """Given"""
+        ingredient = sample_ingredient(user=self.user, name='Tofu')
+        self.one.ingredients.add(ingredient)
+
+        """When"""
+        res = self.client.get(
+            RECIPES_URL,
+            {
+                'tags': str(self.tag1.id),
+                'ingredients': str(ingredient.id),
+                'match': 'all',
+            }
+        )
+
+        """Then"""
+        self.assertEqual(self._ids(res), [self.one.id])
+
+    def test_match_with_many_ids_is_one_query(self):
+        """Given"""
+        tag_ids = [self.tag1.id, self.tag2.id] + list(range(1000, 1060))
+
+        """When"""
+        """Data version, recipes and the two prefetches"""
+        with self.assertNumQueries(4):
+            res = self.client.get(
+                RECIPES_URL,
+                {'tags': ','.join(str(i) for i in tag_ids)}
+            )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(res), [self.one.id, self.both.id])
+
+    def test_invalid_match_mode_is_rejected(self):
+        """When"""
+        res = self.client.get(
+            RECIPES_URL,
+            {'tags': str(self.tag1.id), 'match': 'most'}
+        )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeRangeSortTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.cheap = sample_recipe(
+            user=self.user, title='Toast', time_minutes=5, price=1.50
+        )
+        self.quick = sample_recipe(
+            user=self.user, title='Omelette', time_minutes=10, price=3.00
+        )
+        self.slow = sample_recipe(
+            user=self.user, title='Brisket', time_minutes=240, price=25.00
+        )
+        self.tie = sample_recipe(
+            user=self.user, title='Curry', time_minutes=45, price=3.00
+        )
+
+    def _ids(self, params):
+        res = self.client.get(RECIPES_URL, params)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_range_filters(self):
+        self.assertEqual(
+            self._ids({'max_time': 45}),
+            [self.tie.id, self.quick.id, self.cheap.id]
+        )
+        self.assertEqual(
+            self._ids({'min_price': '3.00', 'max_price': '10'}),
+            [self.tie.id, self.quick.id]
+        )
+
+    def test_sort_breaks_ties_on_id(self):
+        self.assertEqual(
+            self._ids({'sort': 'price'}),
+            [self.cheap.id, self.quick.id, self.tie.id, self.slow.id]
+        )
+        self.assertEqual(
+            self._ids({'sort': '-price'}),
+            [self.slow.id, self.tie.id, self.quick.id, self.cheap.id]
+        )
+        self.assertEqual(
+            self._ids({'sort': 'title', 'max_time': 100}),
+            [self.tie.id, self.quick.id, self.cheap.id]
+        )
+
+    def test_sorted_pages_cover_every_recipe_once(self):
+        """Given"""
+        params = {'sort': 'price', 'page_size': 1}
+        ids = []
+
+        """When"""
+        res = self.client.get(RECIPES_URL, params)
+        while True:
+            ids += [recipe['id'] for recipe in res.data['results']]
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        """Then"""
+        self.assertEqual(
+            ids,
+            [self.cheap.id, self.quick.id, self.tie.id, self.slow.id]
+        )
+
+    def test_invalid_sort_and_range_are_rejected(self):
+        for params in (
+            {'sort': 'link'},
+            {'max_time': 'soon'},
+            {'min_price': 'free'},
+        ):
+            """When"""
+            res = self.client.get(RECIPES_URL, params)
+
+            """Then"""
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), res.data)
+
+
+class RecipeSparseFieldsTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipe = sample_recipe(user=self.user, title='Curry')
+        self.recipe.tags.add(sample_tag(user=self.user))
+        self.recipe.ingredients.add(sample_ingredient(user=self.user))
+
+    def test_list_renders_only_requested_fields(self):
+        """When"""
+        """Data version and recipes, without the related id queries"""
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [{'id': self.recipe.id, 'title': 'Curry'}]
+        )
+
+    def test_sorted_list_pages_without_the_sort_field(self):
+        """Given"""
+        sample_recipe(user=self.user, title='Stew', price=9.00)
+
+        """When"""
+        res = self.client.get(
+            RECIPES_URL,
+            {'fields': 'title', 'sort': '-price', 'page_size': 1}
+        )
+        next_page = self.client.get(res.data['next'])
+
+        """Then"""
+        self.assertEqual(res.data['results'], [{'title': 'Stew'}])
+        self.assertEqual(next_page.data['results'], [{'title': 'Curry'}])
+
+    def test_detail_skips_unrequested_columns_and_prefetches(self):
+        """Given"""
+        url = create_recipe_details_url(self.recipe.id)
+
+        """When"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, {'fields': 'title,tags'})
+
+        """Then"""
+        self.assertEqual(set(res.data), {'title', 'tags'})
+        self.assertEqual(res.data['tags'][0]['name'], 'Starter')
+        """Data version, recipe and the tags prefetch"""
+        self.assertEqual(len(queries), 3)
+        recipe_query = queries.captured_queries[1]['sql']
+        self.assertNotIn('"image"', recipe_query)
+        self.assertNotIn('"link"', recipe_query)
+
+    def test_export_renders_only_requested_fields(self):
+        """When"""
+        res = self.client.get(EXPORT_URL, {'fields': 'id,tags'})
+
+        """Then"""
+        content = b''.join(res.streaming_content)
+        self.assertEqual(
+            json.loads(content.decode()),
+            [{'id': self.recipe.id, 'tags': [self.recipe.tags.get().id]}]
+        )
+
+    def test_unknown_fields_are_rejected(self):
+        """When"""
+        res = self.client.get(RECIPES_URL, {'fields': 'title,image'})
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
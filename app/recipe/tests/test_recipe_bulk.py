@@ -0,0 +1,209 @@
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+
+from recipe.bulk import bulk_save_recipes
+
+BULK_URL = reverse("recipe:recipe-bulk")
+
+
+def recipe_payload(index, **params):
+    payload = {
+        'title': f'Imported recipe {index}',
+        'time_minutes': 10 + index,
+        'price': '5.00',
+    }
+    payload.update(params)
+
+    return payload
+
+
+class RecipeBulkApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user,
+            name='Tofu'
+        )
+
+    def test_bulk_create_recipes_with_relations(self):
+        """Given"""
+        payload = [
+            recipe_payload(
+                i,
+                tags=[self.tag.id],
+                ingredients=[self.ingredient.id]
+            )
+            for i in range(3)
+        ]
+
+        """When"""
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [recipe['title'] for recipe in res.data],
+            [item['title'] for item in payload]
+        )
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 3)
+        for recipe in recipes:
+            self.assertEqual(list(recipe.tags.all()), [self.tag])
+            self.assertEqual(
+                list(recipe.ingredients.all()),
+                [self.ingredient]
+            )
+
+    def test_bulk_update_replaces_fields_and_relations(self):
+        """Given"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Old title',
+            time_minutes=5,
+            price=1.00
+        )
+        recipe.tags.add(self.tag)
+        payload = [
+            recipe_payload(0, id=recipe.id, ingredients=[self.ingredient.id]),
+            recipe_payload(1),
+        ]
+
+        """When"""
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, payload[0]['title'])
+        self.assertEqual(recipe.tags.count(), 0)
+        self.assertEqual(list(recipe.ingredients.all()), [self.ingredient])
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+
+    def test_errors_are_reported_per_item_and_nothing_is_saved(self):
+        """Given"""
+        other_user = get_user_model().objects.create_user(
+            'other@test.com',
+            'Password1'
+        )
+        other_tag = Tag.objects.create(user=other_user, name='Private')
+        payload = [
+            recipe_payload(0, tags=[self.tag.id]),
+            recipe_payload(1, tags=[other_tag.id]),
+            recipe_payload(2, ingredients=[9999]),
+        ]
+
+        """When"""
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('tags', res.data[1])
+        self.assertIn('ingredients', res.data[2])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_field_errors_are_reported_per_item(self):
+        """Given"""
+        payload = [recipe_payload(0), recipe_payload(1, title='')]
+
+        """When"""
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('title', res.data[1])
+
+    def test_repeated_recipe_is_rejected(self):
+        """Given"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Old title',
+            time_minutes=5,
+            price=1.00
+        )
+        payload = [
+            recipe_payload(0, id=recipe.id),
+            recipe_payload(1, id=recipe.id),
+        ]
+
+        """When"""
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data[1])
+
+    def test_updated_recipes_are_validated_inside_the_transaction(self):
+        """Given"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Old title',
+            time_minutes=5,
+            price=1.00
+        )
+        items = [
+            dict(recipe_payload(0, id=recipe.id), tags=[], ingredients=[])
+        ]
+
+        """When"""
+        with CaptureQueriesContext(connection) as queries:
+            bulk_save_recipes(self.user, items)
+
+        """Then"""
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertTrue(sql[0].startswith('SAVEPOINT'))
+        self.assertTrue(any('FROM "core_recipe"' in query for query in sql))
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_updated_recipes_are_locked(self):
+        """Given"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Old title',
+            time_minutes=5,
+            price=1.00
+        )
+        items = [
+            dict(recipe_payload(0, id=recipe.id), tags=[], ingredients=[])
+        ]
+
+        """When"""
+        with CaptureQueriesContext(connection) as queries:
+            bulk_save_recipes(self.user, items)
+
+        """Then"""
+        self.assertTrue(any(
+            'FROM "core_recipe"' in query['sql'] and
+            'FOR UPDATE' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    @skipUnlessDBFeature('can_return_ids_from_bulk_insert')
+    def test_query_count_does_not_grow_with_batch_size(self):
+        """Given"""
+        payload = [
+            recipe_payload(i, tags=[self.tag.id]) for i in range(50)
+        ]
+
+        """When"""
+        with self.assertNumQueries(14):
+            res = self.client.post(BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
@@ -0,0 +1,91 @@
+import json
+
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag
+
+from recipe.serializers import RecipeSerializer
+from recipe.views import RecipeViewSet
+
+EXPORT_URL = reverse("recipe:recipe-export")
+
+
+def sample_recipe(user, **params):
+    defaults = {
+        'title': 'Default Recipe',
+        'time_minutes': 10,
+        'price': 5.00
+    }
+    defaults.update(params)
+
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeExportTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_login_required_for_export(self):
+        """Given"""
+        client = APIClient()
+
+        """When"""
+        res = client.get(EXPORT_URL)
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_streams_every_recipe(self):
+        """Given"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        for i in range(7):
+            sample_recipe(user=self.user, title=f'Recipe {i}').tags.add(tag)
+        other_user = get_user_model().objects.create_user(
+            'other@test.com',
+            'Password1'
+        )
+        sample_recipe(user=other_user)
+
+        """When"""
+        with patch.object(RecipeViewSet, 'export_chunk_size', 3):
+            res = self.client.get(EXPORT_URL)
+            content = b''.join(res.streaming_content)
+
+        """Then"""
+        recipes = Recipe.objects.filter(user=self.user).order_by('-id')
+        serializer = RecipeSerializer(recipes, many=True)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(json.loads(content.decode()), serializer.data)
+
+    def test_export_of_no_recipes_is_empty_array(self):
+        """When"""
+        res = self.client.get(EXPORT_URL)
+
+        """Then"""
+        self.assertEqual(b''.join(res.streaming_content), b'[]')
+
+    def test_export_queries_once_per_chunk(self):
+        """Given"""
+        for i in range(6):
+            sample_recipe(user=self.user, title=f'Recipe {i}')
+
+        """When"""
+        with patch.object(RecipeViewSet, 'export_chunk_size', 3):
+            res = self.client.get(EXPORT_URL)
+            """Two full chunks and a final empty one, each with prefetches"""
+            with self.assertNumQueries(7):
+                b''.join(res.streaming_content)
@@ -0,0 +1,282 @@
+import os
+import shutil
+import tempfile
+
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, RECIPE_IMAGE_UPLOAD_DIR
+
+from recipe.images import process_recipe_image
+from recipe.uploads import read_image_header
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload_url(recipe_id):
+    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+
+
+def sample_image_file(size=(1200, 900), exif=None):
+    """Write a JPEG, optionally with EXIF metadata, to a temporary file"""
+    ntf = tempfile.NamedTemporaryFile(suffix='.jpg')
+    options = {'format': 'JPEG'}
+    if exif:
+        options['exif'] = exif
+    Image.new('RGB', size, color='red').save(ntf, **options)
+    ntf.seek(0)
+
+    return ntf
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BACKGROUND_TASK_WORKERS=0)
+class RecipeImageProcessingTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Tomato soup',
+            time_minutes=20,
+            price=4.00
+        )
+
+    def test_upload_returns_pending_status(self):
+        """When"""
+        with sample_image_file() as ntf:
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart'
+            )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['image_status'], Recipe.IMAGE_PENDING)
+        self.assertIsNone(res.data['image_thumbnail'])
+
+    def test_renditions_are_built_and_exposed(self):
+        """Given"""
+        with sample_image_file() as ntf:
+            self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart'
+            )
+
+        """When"""
+        res = self.client.get(image_upload_url(self.recipe.id))
+
+        """Then"""
+        self.recipe.refresh_from_db()
+        self.assertEqual(res.data['image_status'], Recipe.IMAGE_READY)
+        self.assertIn(self.recipe.image_thumbnail.name,
+                      res.data['image_thumbnail'])
+        with Image.open(self.recipe.image_thumbnail.path) as thumbnail:
+            self.assertEqual(max(thumbnail.size), 150)
+        with Image.open(self.recipe.image_medium.path) as medium:
+            self.assertEqual(medium.size, (800, 600))
+
+    def test_metadata_is_stripped(self):
+        """Given"""
+        exif = b'Exif\x00\x00MM\x00*\x00\x00\x00\x08\x00\x00'
+        with sample_image_file(exif=exif) as ntf:
+            self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart'
+            )
+
+        """Then"""
+        self.recipe.refresh_from_db()
+        for image_file in (self.recipe.image, self.recipe.image_medium):
+            with Image.open(image_file.path) as image:
+                self.assertNotIn('exif', image.info)
+
+    def test_replaced_image_is_not_overwritten(self):
+        """Given"""
+        with sample_image_file() as ntf:
+            self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart'
+            )
+        self.recipe.refresh_from_db()
+        stale_name = 'uploads/recipe/stale.jpg'
+
+        """When"""
+        process_recipe_image(self.recipe.id, stale_name)
+
+        """Then"""
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, Recipe.IMAGE_READY)
+        self.assertNotEqual(self.recipe.image.name, stale_name)
+
+    def test_oriented_image_is_turned_upright(self):
+        """Given"""
+        # One IFD entry, orientation 6: the stored pixels are turned 90
+        # degrees counter clockwise from upright
+        exif = (
+            b'Exif\x00\x00MM\x00*\x00\x00\x00\x08\x00\x01'
+            b'\x01\x12\x00\x03\x00\x00\x00\x01\x00\x06\x00\x00'
+            b'\x00\x00\x00\x00'
+        )
+
+        """When"""
+        with sample_image_file(exif=exif) as ntf:
+            self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart'
+            )
+
+        """Then"""
+        self.recipe.refresh_from_db()
+        with Image.open(self.recipe.image.path) as image:
+            self.assertEqual(image.size, (900, 1200))
+            self.assertNotIn('exif', image.info)
+        with Image.open(self.recipe.image_medium.path) as medium:
+            self.assertEqual(medium.size, (600, 800))
+
+    def test_decompression_bomb_is_marked_failed(self):
+        """Given"""
+        with sample_image_file() as ntf:
+            name = default_storage.save('uploads/recipe/bomb.jpg', ntf)
+        Recipe.objects.filter(id=self.recipe.id).update(
+            image=name,
+            image_status=Recipe.IMAGE_PENDING
+        )
+
+        """When"""
+        with patch.object(Image, 'MAX_IMAGE_PIXELS', 1000), \
+                self.assertLogs('recipe.images', 'WARNING'):
+            process_recipe_image(self.recipe.id, name)
+
+        """Then"""
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, Recipe.IMAGE_FAILED)
+        self.assertFalse(self.recipe.image_medium)
+
+    def test_undecodable_image_is_marked_failed(self):
+        """Given"""
+        name = default_storage.save('uploads/recipe/broken.jpg',
+                                    tempfile.TemporaryFile())
+        Recipe.objects.filter(id=self.recipe.id).update(
+            image=name,
+            image_status=Recipe.IMAGE_PENDING
+        )
+
+        """When"""
+        with self.assertLogs('recipe.images', 'WARNING'):
+            process_recipe_image(self.recipe.id, name)
+
+        """Then"""
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, Recipe.IMAGE_FAILED)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, BACKGROUND_TASK_WORKERS=0)
+class StreamingImageUploadTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title='Tomato soup',
+            time_minutes=20,
+            price=4.00
+        )
+        self.upload_dir = os.path.join(MEDIA_ROOT, RECIPE_IMAGE_UPLOAD_DIR)
+        os.makedirs(self.upload_dir, exist_ok=True)
+
+    def _leftover_temporary_files(self):
+        return [
+            name for name in os.listdir(self.upload_dir)
+            if name.endswith('.upload')
+        ]
+
+    def test_upload_is_moved_into_storage(self):
+        """When"""
+        with sample_image_file() as ntf:
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart'
+            )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self._leftover_temporary_files(), [])
+
+    @override_settings(RECIPE_IMAGE_MAX_UPLOAD_SIZE=1024)
+    def test_oversized_upload_is_rejected(self):
+        """When"""
+        with sample_image_file() as ntf:
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart'
+            )
+
+        """Then"""
+        self.assertEqual(
+            res.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+        self.assertEqual(self._leftover_temporary_files(), [])
+
+    def test_non_image_with_image_extension_is_rejected(self):
+        """Given"""
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            ntf.write(b'not an image at all')
+            ntf.seek(0)
+
+            """When"""
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {'image': ntf},
+                format='multipart'
+            )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_header_is_read_without_decoding(self):
+        """Given"""
+        with sample_image_file(size=(640, 480)) as ntf:
+            """Truncating the pixel data leaves a readable header"""
+            ntf.truncate(1024)
+            ntf.seek(0)
+
+            """When"""
+            image_format, size = read_image_header(ntf)
+
+        """Then"""
+        self.assertEqual(image_format, 'JPEG')
+        self.assertEqual(size, (640, 480))
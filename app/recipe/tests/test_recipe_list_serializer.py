@@ -0,0 +1,69 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.benchmark import seed_recipe_data
+from core.models import Recipe
+
+from recipe.serializers import RecipeSerializer, RecipeValuesSerializer
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+class RecipeValuesSerializerTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        seed_recipe_data(
+            self.user,
+            recipes=30,
+            tags=5,
+            ingredients=10,
+            links_per_recipe=3
+        )
+        Recipe.objects.create(
+            user=self.user,
+            title='No links',
+            time_minutes=1,
+            price='0.50',
+            link='https://example.com/recipe'
+        )
+        self.queryset = Recipe.objects.filter(user=self.user).order_by('-id')
+
+    def test_output_is_byte_identical(self):
+        """Given"""
+        instances = RecipeSerializer.setup_eager_loading(self.queryset)
+        rows = RecipeValuesSerializer.setup_eager_loading(self.queryset)
+
+        """When"""
+        expected = JSONRenderer().render(
+            RecipeSerializer(instances, many=True).data
+        )
+        output = JSONRenderer().render(
+            RecipeValuesSerializer(rows, many=True).data
+        )
+
+        """Then"""
+        self.assertEqual(output, expected)
+
+    def test_list_endpoint_renders_serializer_output(self):
+        """Given"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        instances = RecipeSerializer.setup_eager_loading(self.queryset)
+
+        """When"""
+        res = client.get(RECIPES_URL, {'sort': 'price'})
+
+        """Then"""
+        expected = RecipeSerializer(
+            instances.order_by('price', 'id'),
+            many=True
+        ).data
+        self.assertEqual(res.json()['results'], expected)
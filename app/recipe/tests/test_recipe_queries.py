@@ -0,0 +1,99 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+"""Data version, recipes, tags prefetch and ingredients prefetch"""
+LIST_QUERY_BUDGET = 4
+DETAIL_QUERY_BUDGET = 4
+
+
+def create_recipe_details_url(recipe_id):
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def seed_recipes(user, count):
+    """Create recipes that each have a couple of tags and ingredients"""
+    tags = [
+        Tag.objects.get_or_create(user=user, name=f'Tag {i}')[0]
+        for i in range(3)
+    ]
+    ingredients = [
+        Ingredient.objects.get_or_create(user=user, name=f'Ingredient {i}')[0]
+        for i in range(3)
+    ]
+    recipes = []
+    for i in range(count):
+        recipe = Recipe.objects.create(
+            user=user,
+            title=f'Recipe {i}',
+            time_minutes=10,
+            price=5.00,
+        )
+        recipe.tags.add(*tags[:2])
+        recipe.ingredients.add(*ingredients[1:])
+        recipes.append(recipe)
+
+    return recipes
+
+
+class RecipeQueryBudgetTests(TestCase):
+    """Guard against N+1 queries on the recipe endpoints"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_query_count_is_constant(self):
+        for count in (1, 25):
+            """Given"""
+            seed_recipes(self.user, count)
+
+            """When"""
+            with self.assertNumQueries(LIST_QUERY_BUDGET):
+                res = self.client.get(RECIPES_URL)
+
+            """Then"""
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(res.data['results'][0]['tags']), 2)
+            self.assertEqual(len(res.data['results'][0]['ingredients']), 2)
+
+    def test_filtered_list_query_count_is_constant(self):
+        """Given"""
+        recipes = seed_recipes(self.user, 10)
+        tag_ids = list(recipes[0].tags.values_list('id', flat=True))
+
+        """When"""
+        with self.assertNumQueries(LIST_QUERY_BUDGET):
+            res = self.client.get(
+                RECIPES_URL,
+                {'tags': ','.join(str(tag_id) for tag_id in tag_ids)}
+            )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_query_count_is_constant(self):
+        """Given"""
+        recipe = seed_recipes(self.user, 5)[0]
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Extra'))
+        url = create_recipe_details_url(recipe.id)
+
+        """When"""
+        with self.assertNumQueries(DETAIL_QUERY_BUDGET):
+            res = self.client.get(url)
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tags']), 3)
+        self.assertEqual(res.data['tags'][0]['name'], 'Tag 0')
@@ -0,0 +1,174 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+from recipe import response_cache
+
+RECIPES_URL = reverse("recipe:recipe-list")
+BULK_URL = reverse("recipe:recipe-bulk")
+
+
+def sample_recipe(user, title):
+    return Recipe.objects.create(
+        user=user,
+        title=title,
+        time_minutes=10,
+        price=5.00
+    )
+
+
+class RecipeSearchTests(TestCase):
+
+    def setUp(self):
+        response_cache.response_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.ingredient = Ingredient.objects.create(
+            user=self.user,
+            name='Chickpeas'
+        )
+        self.curry = sample_recipe(self.user, 'Thai green curry')
+        self.curry.tags.add(self.tag)
+        self.stew = sample_recipe(self.user, 'Winter stew')
+        self.stew.ingredients.add(self.ingredient)
+
+    def _search(self, text):
+        res = self.client.get(RECIPES_URL, {'q': text})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        return [recipe['id'] for recipe in res.data['results']]
+
+    def test_search_matches_title_tags_and_ingredients(self):
+        self.assertEqual(self._search('curry'), [self.curry.id])
+        self.assertEqual(self._search('vegan'), [self.curry.id])
+        self.assertEqual(self._search('chickpeas'), [self.stew.id])
+
+    def test_search_requires_every_word(self):
+        self.assertEqual(self._search('green curry'), [self.curry.id])
+        self.assertEqual(self._search('green stew'), [])
+
+    def test_search_is_limited_to_the_users_recipes(self):
+        """Given"""
+        other_user = get_user_model().objects.create_user(
+            'other@test.com',
+            'Password1'
+        )
+        sample_recipe(other_user, 'Red curry')
+
+        """Then"""
+        self.assertEqual(self._search('curry'), [self.curry.id])
+
+    def test_title_change_updates_document(self):
+        """When"""
+        self.curry.title = 'Massaman'
+        self.curry.save()
+
+        """Then"""
+        self.assertEqual(self._search('curry'), [])
+        self.assertEqual(self._search('massaman'), [self.curry.id])
+
+    def test_link_changes_update_document(self):
+        """When"""
+        self.stew.tags.add(self.tag)
+        self.curry.tags.remove(self.tag)
+
+        """Then"""
+        self.assertEqual(self._search('vegan'), [self.stew.id])
+
+        """When"""
+        self.ingredient.recipe_set.add(self.curry)
+        self.ingredient.recipe_set.clear()
+
+        """Then"""
+        self.assertEqual(self._search('chickpeas'), [])
+
+    def test_renamed_and_deleted_names_update_document(self):
+        """When"""
+        self.tag.name = 'Plant based'
+        self.tag.save()
+        self.ingredient.delete()
+
+        """Then"""
+        self.assertEqual(self._search('vegan'), [])
+        self.assertEqual(self._search('plant'), [self.curry.id])
+        self.assertEqual(self._search('chickpeas'), [])
+
+    def test_bulk_saved_recipes_are_searchable(self):
+        """When"""
+        self.client.post(BULK_URL, [
+            {
+                'title': 'Falafel wrap',
+                'time_minutes': 20,
+                'price': '4.00',
+                'ingredients': [self.ingredient.id],
+            },
+        ], format='json')
+
+        """Then"""
+        falafel = Recipe.objects.get(title='Falafel wrap')
+        self.assertEqual(
+            self._search('chickpeas'),
+            [falafel.id, self.stew.id]
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', 'Requires PostgreSQL')
+    def test_title_matches_rank_above_name_matches(self):
+        """Given"""
+        tagged = sample_recipe(self.user, 'Weeknight dinner')
+        tagged.tags.add(Tag.objects.create(user=self.user, name='Curry'))
+
+        """Then"""
+        self.assertEqual(self._search('curry'), [self.curry.id, tagged.id])
+
+    def test_equally_ranked_results_page_without_repeats(self):
+        """Given"""
+        for i in range(5):
+            sample_recipe(self.user, f'Curry {i}')
+        ids = []
+
+        """When"""
+        res = self.client.get(RECIPES_URL, {'q': 'curry', 'page_size': 2})
+        while True:
+            ids += [recipe['id'] for recipe in res.data['results']]
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        """Then"""
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(len(set(ids)), 6)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Requires PostgreSQL')
+    def test_tied_ranks_page_without_repeats_or_gaps(self):
+        """Given"""
+        for i in range(25):
+            sample_recipe(self.user, 'Green curry with green beans')
+        expected = set(
+            Recipe.objects.filter(user=self.user, title__icontains='green')
+            .values_list('id', flat=True)
+        )
+        ids = []
+
+        """When"""
+        res = self.client.get(RECIPES_URL, {'q': 'green', 'page_size': 4})
+        for _ in range(len(expected)):
+            ids += [recipe['id'] for recipe in res.data['results']]
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        """Then"""
+        self.assertEqual(len(ids), len(expected))
+        self.assertEqual(set(ids), expected)
@@ -0,0 +1,204 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag
+from recipe import response_cache
+from recipe.response_cache import ResponseCache
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+class RecipeResponseCacheTests(TestCase):
+
+    def setUp(self):
+        response_cache.response_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        self.tag2 = Tag.objects.create(user=self.user, name='Spicy')
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title='Curry',
+            time_minutes=30,
+            price=6.00
+        )
+        recipe.tags.add(self.tag1, self.tag2)
+
+    def tearDown(self):
+        response_cache.response_cache.clear()
+
+    def test_repeated_list_is_served_from_cache(self):
+        """Given"""
+        first = self.client.get(RECIPES_URL, {'tags': self.tag1.id})
+
+        """When"""
+        """Only the data version is read"""
+        with self.assertNumQueries(1):
+            second = self.client.get(RECIPES_URL, {'tags': self.tag1.id})
+
+        """Then"""
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        self.assertEqual(
+            response_cache.response_cache.stats(),
+            {'hits': 1, 'misses': 1}
+        )
+
+    def test_equivalent_queries_share_an_entry(self):
+        """Given"""
+        self.client.get(
+            RECIPES_URL,
+            {'tags': f'{self.tag1.id},{self.tag2.id}', 'match': 'all'}
+        )
+
+        """When"""
+        res = self.client.get(
+            f'{RECIPES_URL}?match=all&tags={self.tag2.id},{self.tag1.id}'
+        )
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(response_cache.response_cache.hits, 1)
+
+    def test_different_queries_do_not_share_an_entry(self):
+        """Given"""
+        self.client.get(RECIPES_URL, {'tags': self.tag1.id})
+
+        """When"""
+        self.client.get(RECIPES_URL, {'ingredients': self.tag1.id})
+
+        """Then"""
+        self.assertEqual(response_cache.response_cache.hits, 0)
+
+    def test_users_write_invalidates_their_entries(self):
+        """Given"""
+        self.client.get(RECIPES_URL)
+
+        """When"""
+        self.client.post(RECIPES_URL, {
+            'title': 'Stew',
+            'time_minutes': 60,
+            'price': '4.00',
+        })
+        res = self.client.get(RECIPES_URL)
+
+        """Then"""
+        self.assertEqual(len(res.json()['results']), 2)
+        self.assertEqual(response_cache.response_cache.hits, 0)
+
+    def test_other_users_write_keeps_entries(self):
+        """Given"""
+        other_user = get_user_model().objects.create_user(
+            'other@test.com',
+            'Password1'
+        )
+        self.client.get(RECIPES_URL)
+
+        """When"""
+        Recipe.objects.create(
+            user=other_user,
+            title='Stew',
+            time_minutes=60,
+            price=4.00
+        )
+        self.client.get(RECIPES_URL)
+
+        """Then"""
+        self.assertEqual(response_cache.response_cache.hits, 1)
+
+    def test_errors_are_not_cached(self):
+        """Given"""
+        self.client.get(RECIPES_URL, {'match': 'some'})
+
+        """When"""
+        res = self.client.get(RECIPES_URL, {'match': 'some'})
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response_cache.response_cache.hits, 0)
+
+    def test_counters_are_logged_every_interval(self):
+        """Given"""
+        cache = ResponseCache(
+            local_max_size=10,
+            ttl=60,
+            stats_log_interval=2
+        )
+
+        """When"""
+        with patch.object(response_cache, 'response_cache', cache), \
+                self.assertLogs('recipe.response_cache', 'INFO') as logs:
+            self.client.get(RECIPES_URL)
+            self.client.get(RECIPES_URL)
+
+        """Then"""
+        self.assertEqual(logs.output, [
+            'INFO:recipe.response_cache:Response cache: 1 hits, 1 misses',
+        ])
+
+    def test_local_tier_is_bounded_by_content_bytes(self):
+        """Given"""
+        cache = ResponseCache(local_max_size=10, ttl=60, local_max_bytes=10)
+        cache.set('a', (200, 'application/json', b'x' * 6))
+
+        """When"""
+        cache.set('b', (200, 'application/json', b'x' * 6))
+
+        """Then"""
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('b'))
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+})
+class SharedResponseCacheTests(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.cache = ResponseCache(
+            local_max_size=10,
+            ttl=60,
+            shared_cache='default'
+        )
+        self.user = get_user_model().objects.create_user(
+            'test@test.com',
+            'Password1'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_entries_are_shared_between_processes(self):
+        """Given"""
+        with patch.object(response_cache, 'response_cache', self.cache):
+            first = self.client.get(RECIPES_URL)
+
+        """When"""
+        other_process_cache = ResponseCache(
+            local_max_size=10,
+            ttl=60,
+            shared_cache='default'
+        )
+        with patch.object(
+            response_cache, 'response_cache', other_process_cache
+        ):
+            second = self.client.get(RECIPES_URL)
+
+        """Then"""
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(other_process_cache.hits, 1)
+        self.assertEqual(len(self.cache.local), 0)
@@ -1,4 +1,8 @@
+from unittest.mock import patch
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -7,9 +11,11 @@ from rest_framework import status
 
 from core.models import Tag, Recipe
 
+from recipe import bulk
 from recipe.serializers import TagSerializer
 
 TAGS_URL = reverse("recipe:tag-list")
+TAGS_BULK_URL = reverse("recipe:tag-bulk")
 
 
 class PublicTagsTagApiTest(TestCase):
@@ -45,7 +51,7 @@ class PrivateTagsApiTests(TestCase):
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_should_have_tags_for_authenticated_user(self):
         """Given"""
@@ -61,8 +67,8 @@ class PrivateTagsApiTests(TestCase):
 
         """Then"""
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
 
     def test_create_tag_successful(self):
         """Given"""
@@ -80,6 +86,33 @@ class PrivateTagsApiTests(TestCase):
         ).exists()
         self.assertTrue(exists)
 
+    def test_create_tag_with_duplicate_name_rejected(self):
+        """Given"""
+        Tag.objects.create(user=self.user, name="Vegan")
+
+        """When"""
+        res = self.client.post(TAGS_URL, {'name': ' VEGAN'})
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_create_tag_racing_duplicate_name_rejected(self):
+        """Given"""
+        Tag.objects.create(user=self.user, name='Vegan')
+        payload = {'name': 'vegan'}
+
+        """When"""
+        with patch.object(
+            TagSerializer, 'validate_name', lambda self, value: value
+        ):
+            res = self.client.post(TAGS_URL, payload)
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', res.data)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
     def test_create_tag_invalid_payload(self):
         """Given"""
         payload = {
@@ -110,8 +143,8 @@ class PrivateTagsApiTests(TestCase):
         """Then"""
         serializer1 = TagSerializer(tag1)
         serializer2 = TagSerializer(tag2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data['results'])
+        self.assertNotIn(serializer2.data, res.data['results'])
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
     def test_retrieved_tags_assigned_unique(self):
@@ -137,4 +170,106 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
         """Then"""
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_assigned_only_uses_exists_without_distinct(self):
+        """Given"""
+        tag = Tag.objects.create(user=self.user, name="Ice Cream")
+        recipe = Recipe.objects.create(
+            title='Ice cream sunday',
+            time_minutes=10,
+            price=5.00,
+            user=self.user,
+        )
+        recipe.tags.add(tag)
+
+        """When"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TAGS_URL, {'assigned_only': 1})
+
+        """Then"""
+        sql = queries.captured_queries[-1]['sql'].upper()
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('DISTINCT', sql)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_bulk_get_or_create_tags_by_name(self):
+        """Given"""
+        existing = Tag.objects.create(user=self.user, name="Vegan")
+        other_user = get_user_model().objects.create_user(
+            'test2@test.com'
+            "Password1"
+        )
+        Tag.objects.create(user=other_user, name="Quick")
+        payload = {'names': ['Vegan', 'Quick', 'Spicy', 'Quick']}
+
+        """When"""
+        with self.assertNumQueries(9):
+            res = self.client.post(TAGS_BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data), ['Vegan', 'Quick', 'Spicy'])
+        self.assertEqual(res.data['Vegan'], existing.id)
+        tags = Tag.objects.filter(user=self.user)
+        self.assertEqual(tags.count(), 3)
+        for tag in tags:
+            self.assertEqual(res.data[tag.name], tag.id)
+
+    def test_bulk_get_or_create_matches_normalized_names(self):
+        """Given"""
+        existing = Tag.objects.create(user=self.user, name="Vegan")
+        payload = {'names': ['VEGAN', 'vegan', 'Spicy', 'SPICY']}
+
+        """When"""
+        res = self.client.post(TAGS_BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.data['VEGAN'], existing.id)
+        self.assertEqual(res.data['vegan'], existing.id)
+        self.assertEqual(res.data['Spicy'], res.data['SPICY'])
+        spicy = Tag.objects.get(id=res.data['Spicy'])
+        self.assertEqual(spicy.name, 'Spicy')
+
+    def test_bulk_get_or_create_is_idempotent(self):
+        """Given"""
+        payload = {'names': ['Vegan', 'Spicy']}
+        first = self.client.post(TAGS_BULK_URL, payload, format='json')
+
+        """When"""
+        second = self.client.post(TAGS_BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_bulk_get_or_create_survives_racing_single_create(self):
+        """Given"""
+        ids_by_normalized_name = bulk._ids_by_normalized_name
+        raced = []
+
+        def create_racing_tag(*args):
+            ids = ids_by_normalized_name(*args)
+            if not raced:
+                raced.append(Tag.objects.create(user=self.user, name='spicy'))
+            return ids
+
+        payload = {'names': ['Vegan', 'Spicy']}
+
+        """When"""
+        with patch.object(
+            bulk, '_ids_by_normalized_name', create_racing_tag
+        ):
+            res = self.client.post(TAGS_BULK_URL, payload, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['Spicy'], raced[0].id)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_bulk_get_or_create_invalid_payload(self):
+        """When"""
+        res = self.client.post(TAGS_BULK_URL, {'names': []}, format='json')
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
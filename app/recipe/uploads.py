@@ -0,0 +1,120 @@
+import os
+import tempfile
+
+from PIL import Image
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.models import RECIPE_IMAGE_UPLOAD_DIR
+
+ALLOWED_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+# Room for the multipart boundaries and headers around the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'The uploaded image is too large.'
+    default_code = 'upload_too_large'
+
+
+def read_image_header(upload):
+    """Identify an uploaded image from its header, without decoding it
+
+    Raises ValueError if the header is not one of the allowed formats or
+    declares more pixels than Pillow is configured to decode.
+    """
+    try:
+        if hasattr(upload, 'temporary_file_path'):
+            with Image.open(upload.temporary_file_path()) as image:
+                image_format, (width, height) = image.format, image.size
+        else:
+            image = Image.open(upload)
+            image_format, (width, height) = image.format, image.size
+            upload.seek(0)
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise ValueError('Unrecognised image header')
+
+    if image_format not in ALLOWED_IMAGE_FORMATS:
+        raise ValueError(f'Unsupported image format {image_format}')
+    if Image.MAX_IMAGE_PIXELS and width * height > Image.MAX_IMAGE_PIXELS:
+        raise ValueError('Image dimensions are too large')
+
+    return image_format, (width, height)
+
+
+class StreamedUploadedFile(UploadedFile):
+    """An upload written to a temporary file beside recipe images
+
+    Keeping the temporary file on the same filesystem as its final
+    location lets FileSystemStorage rename it into place instead of
+    copying it.
+    """
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        directory = os.path.join(settings.MEDIA_ROOT, RECIPE_IMAGE_UPLOAD_DIR)
+        os.makedirs(directory, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(suffix='.upload', dir=directory)
+        super().__init__(file, name, content_type, size, charset,
+                         content_type_extra)
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            # The file was already moved into storage
+            pass
+
+
+class StreamingImageUploadHandler(FileUploadHandler):
+    """Stream image uploads to disk in chunks and enforce a size limit
+
+    Requests that declare a body larger than the limit are rejected
+    before any of it is read, and uploads that exceed the limit while
+    streaming are discarded at the first chunk over it.
+    """
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = settings.RECIPE_IMAGE_MAX_UPLOAD_SIZE
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        if content_length > self.max_size + MULTIPART_OVERHEAD:
+            raise UploadTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.file = StreamedUploadedFile(
+            self.file_name,
+            self.content_type,
+            0,
+            self.charset,
+            self.content_type_extra
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.file.close()
+            raise UploadTooLarge()
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            self.file.close()
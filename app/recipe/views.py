@@ -1,21 +1,39 @@
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
+from rest_framework import fields, viewsets, mixins, status
 from rest_framework.permissions import IsAuthenticated
 
+from core.authentication import CachedTokenAuthentication
 from core.models import Tag, Ingredient, Recipe
+from core.search import search_recipes, uses_full_text_search
+from core.tasks import enqueue
 
 from recipe import serializers
+from recipe.autocomplete import autocomplete
+from recipe.bulk import bulk_get_or_create_by_name, bulk_save_recipes
+from recipe.conditional import ConditionalGetMixin
+from recipe.images import process_recipe_image, stored_image_names
+from recipe.pagination import KeysetPagination
+from recipe.response_cache import CachedListMixin
+from recipe.streaming import stream_json_array
+from recipe.uploads import StreamingImageUploadHandler
 
 
-class BaseRecipeAttributeViewSet(viewsets.GenericViewSet,
+class BaseRecipeAttributeViewSet(ConditionalGetMixin,
+                                 viewsets.GenericViewSet,
                                  mixins.ListModelMixin,
                                  mixins.CreateModelMixin):
 
     """Base viewset for the user owned recipe attributes"""
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    ordering = ('-name', '-id')
 
     def get_queryset(self):
         """Return recipe objects for the current authenticated user only"""
@@ -24,60 +42,255 @@ class BaseRecipeAttributeViewSet(viewsets.GenericViewSet,
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            queryset = self._filter_assigned(queryset)
 
         return queryset.filter(
             user=self.request.user
-        ).order_by('-name').distinct()
+        ).order_by(*self.ordering)
+
+    def _filter_assigned(self, queryset):
+        """Keep objects used by a recipe, with an EXISTS semi-join
+
+        Checking the recipe link table per row avoids joining every link
+        and de-duplicating the result with DISTINCT.
+        """
+        field = Recipe._meta.get_field(self.recipe_field)
+        links = field.remote_field.through.objects.filter(
+            **{field.m2m_reverse_field_name(): OuterRef('pk')}
+        )
+
+        return queryset.annotate(
+            assigned=Exists(links)
+        ).filter(assigned=True)
 
     def perform_create(self, serializer):
-        """Create a new recipe object"""
-        serializer.save(user=self.request.user)
+        """Create a new object, rejecting a name created since validation"""
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
+        except IntegrityError:
+            raise ValidationError({
+                'name': [serializers.DUPLICATE_NAME_ERROR]
+            })
+
+    def get_serializer_class(self):
+        """Return the name list serializer for bulk requests"""
+        if self.action == 'bulk':
+            return serializers.NameListSerializer
+        elif self.action == 'autocomplete':
+            return serializers.AutocompleteSerializer
+
+        return self.serializer_class
+
+    @action(methods=['POST'], detail=False)
+    def bulk(self, request):
+        """Get or create objects by name and return their ids"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = bulk_get_or_create_by_name(
+            self.queryset.model,
+            request.user,
+            serializer.validated_data['names']
+        )
+
+        return Response(ids, status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False)
+    def autocomplete(self, request):
+        """Return the names that start with a prefix"""
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        matches = autocomplete(
+            self.queryset.model,
+            request.user,
+            serializer.validated_data['prefix'],
+            serializer.validated_data['limit']
+        )
+
+        return Response(matches)
 
 
 class TagViewSet(BaseRecipeAttributeViewSet):
     """Manage tags in the database"""
     queryset = Tag.objects.all()
     serializer_class = serializers.TagSerializer
+    recipe_field = 'tags'
 
 
 class IngredientViewSet(BaseRecipeAttributeViewSet):
     """Manage ingredients in the database"""
     queryset = Ingredient.objects.all()
     serializer_class = serializers.IngredientSerializer
+    recipe_field = 'ingredients'
 
 
-class RecipeViewSet(viewsets.ModelViewSet,):
+class RecipeViewSet(ConditionalGetMixin, CachedListMixin,
+                    viewsets.ModelViewSet):
     """Manage Recipe in the database"""
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     queryset = Recipe.objects.all()
     serializer_class = serializers.RecipeSerializer
+    pagination_class = KeysetPagination
+    ordering = '-id'
+    export_chunk_size = 500
+    match_modes = ('any', 'all')
+    cache_set_params = ('tags', 'ingredients', 'fields')
+    sort_fields = ('price', 'time_minutes', 'title')
+    sparse_field_actions = ('list', 'retrieve', 'export')
+    range_filters = (
+        ('max_time', 'time_minutes__lte', fields.IntegerField(min_value=0)),
+        ('min_price', 'price__gte', fields.DecimalField(5, 2)),
+        ('max_price', 'price__lte', fields.DecimalField(5, 2)),
+    )
+
+    def initialize_request(self, request, *args, **kwargs):
+        """Stream image uploads to disk instead of buffering them"""
+        if self.action_map.get(request.method.lower()) == 'upload_image':
+            request.upload_handlers = [StreamingImageUploadHandler(request)]
+
+        return super().initialize_request(request, *args, **kwargs)
 
     def _params_to_ints(self, qs):
         """Convert a list of string IDs to a list of integers"""
         return [int(str_id) for str_id in qs.split(',')]
 
+    def _get_match_mode(self):
+        """Return whether recipes must match any or all of the given ids"""
+        match = self.request.query_params.get('match', 'any')
+        if match not in self.match_modes:
+            raise ValidationError(
+                {'match': f'Must be one of: {", ".join(self.match_modes)}'}
+            )
+
+        return match
+
+    def _get_search_text(self):
+        return self.request.query_params.get('q', '').strip()
+
+    def _get_requested_fields(self):
+        """Return the fields named by ?fields=, or None to render all"""
+        param = self.request.query_params.get('fields')
+        if not param or self.action not in self.sparse_field_actions:
+            return None
+
+        fields = [name for name in param.split(',') if name]
+        unknown = set(fields) - set(self.serializer_class.Meta.fields)
+        if unknown:
+            raise ValidationError(
+                {'fields': f'Unknown fields: {", ".join(sorted(unknown))}'}
+            )
+
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        """Render only the requested fields"""
+        fields = self._get_requested_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+
+        return super().get_serializer(*args, **kwargs)
+
+    def get_ordering(self):
+        """Return the requested sort, then search rank, then newest first
+
+        Sorts break ties on id in the same direction. KeysetPagination
+        keeps the whole (field, id) key in its cursor, so every page is
+        a range scan of the (user, field, id) index, even through ties.
+        """
+        sort = self.request.query_params.get('sort')
+        if sort:
+            if sort.lstrip('-') not in self.sort_fields:
+                raise ValidationError({
+                    'sort': f'Must be one of: {", ".join(self.sort_fields)}'
+                })
+            return (sort, '-id' if sort.startswith('-') else 'id')
+        if self._get_search_text() and uses_full_text_search():
+            return ('-rank', self.ordering)
+
+        return (self.ordering,)
+
+    def _filter_by_range(self, queryset):
+        """Apply the time and price bounds given in the query"""
+        for param, lookup, field in self.range_filters:
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                value = field.to_internal_value(value)
+            except ValidationError as error:
+                raise ValidationError({param: error.detail})
+            queryset = queryset.filter(**{lookup: value})
+
+        return queryset
+
+    def _filter_by_related(self, queryset, field_name, ids, match):
+        """Filter recipes by linked ids with a single link table subquery
+
+        Matching recipe ids are selected from the link table, grouped per
+        recipe when all ids must match, so the outer query never joins
+        the links and never returns a recipe twice.
+        """
+        field = Recipe._meta.get_field(field_name)
+        recipe_column = field.m2m_field_name()
+        related_column = field.m2m_reverse_field_name()
+        links = field.remote_field.through.objects.filter(
+            **{f'{related_column}__in': ids}
+        )
+        if match == 'all':
+            links = links.values(recipe_column).annotate(
+                matched=Count(related_column, distinct=True)
+            ).filter(matched=len(set(ids)))
+
+        return queryset.filter(id__in=links.values(recipe_column))
+
     def get_queryset(self):
         """Return recipes for the current authenticated user only"""
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
+        match = self._get_match_mode()
         queryset = self.queryset
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = self._filter_by_related(
+                queryset, 'tags', tag_ids, match
+            )
         if ingredients:
             ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            queryset = self._filter_by_related(
+                queryset, 'ingredients', ingredient_ids, match
+            )
+
+        queryset = self._filter_by_range(
+            queryset.filter(user=self.request.user)
+        )
+        search_text = self._get_search_text()
+        if search_text:
+            queryset = search_recipes(queryset, search_text)
+        queryset = queryset.defer(
+            'search_document', 'search_vector'
+        ).order_by(*self.get_ordering())
 
-        return queryset.filter(user=self.request.user).order_by('-id')
+        return self.get_serializer_class().setup_eager_loading(
+            queryset,
+            self._get_requested_fields()
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
 
     def get_serializer_class(self):
         """Return apprioate serializer class"""
-        if self.action == 'retrieve':
+        if self.action == 'list' and self.request.method == 'GET':
+            return serializers.RecipeValuesSerializer
+        elif self.action == 'retrieve':
             return serializers.RecipeDetailSerializer
         elif self.action == 'upload_image':
             return serializers.RecipeImageSerializer
+        elif self.action == 'bulk':
+            return serializers.RecipeBulkSerializer
 
         return self.serializer_class
 
@@ -85,19 +298,64 @@ class RecipeViewSet(viewsets.ModelViewSet,):
         """Enables the creating of recipe by adding the auth'ed user"""
         serializer.save(user=self.request.user)
 
-    @action(methods=['POST'], detail=True, url_path='upload-image')
+    @action(methods=['GET'], detail=False)
+    def export(self, request):
+        """Stream every matching recipe as one JSON array"""
+        queryset = self.filter_queryset(self.get_queryset())
+        content = stream_json_array(
+            queryset,
+            self.get_serializer_class(),
+            self.export_chunk_size,
+            context=self.get_serializer_context(),
+            fields=self._get_requested_fields(),
+        )
+
+        return StreamingHttpResponse(content, content_type='application/json')
+
+    @action(methods=['POST'], detail=False)
+    def bulk(self, request):
+        """Create or update a list of recipes in one transaction"""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        recipes = bulk_save_recipes(request.user, serializer.validated_data)
+
+        saved = serializers.RecipeSerializer.setup_eager_loading(
+            Recipe.objects.filter(id__in=[recipe.id for recipe in recipes])
+        ).in_bulk()
+        output = serializers.RecipeSerializer(
+            [saved[recipe.id] for recipe in recipes],
+            many=True
+        )
+
+        return Response(output.data, status=status.HTTP_201_CREATED)
+
+    @action(methods=['GET', 'POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
+        """Upload an image and queue building its renditions"""
         recipe = self.get_object()
+        if request.method == 'GET':
+            return Response(self.get_serializer(recipe).data)
+
+        previous_images = stored_image_names(recipe)
         serializer = self.get_serializer(
             recipe,
             data=request.data
         )
 
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(
+                image_status=Recipe.IMAGE_PENDING,
+                image_thumbnail=None,
+                image_medium=None
+            )
+            data = serializer.data
+            enqueue(process_recipe_image, recipe.id, recipe.image.name)
+            for name in previous_images:
+                default_storage.delete(name)
+
             return Response(
-                serializer.data,
-                status=status.HTTP_200_OK
+                data,
+                status=status.HTTP_202_ACCEPTED
             )
 
         return Response(
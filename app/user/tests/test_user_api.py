@@ -1,10 +1,17 @@
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core import authentication
+from core.authentication import TokenCache
+
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
@@ -193,3 +200,43 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+})
+class CachedTokenUserApiTests(TestCase):
+    """Tests for the Users private API with token credentials cached"""
+
+    def setUp(self):
+        caches['default'].clear()
+        patcher = patch.object(authentication, 'token_cache', TokenCache(
+            local_max_size=10,
+            local_ttl=60,
+            shared_cache='default',
+            shared_ttl=60,
+        ))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = create_user(
+            email='test.jenkins@clicktravel.com',
+            password='testpass',
+            name='Old',
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_profile_update_is_returned_straight_after(self):
+        """Given"""
+        self.client.get(ME_URL)
+        self.client.patch(ME_URL, {'name': 'New'})
+
+        """When"""
+        res = self.client.get(ME_URL)
+
+        """Then"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'New')